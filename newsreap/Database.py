@@ -99,7 +99,11 @@ class Database(object):
         if self._engine is not None:
             logger.debug('Closing database engine %s.' % self)
             self._session.expunge_all()
-            self._session.close_all()
+
+            # Only close our own session; close_all() would close every
+            # session in the process (including those of other Database
+            # objects still in use)
+            self._session.close()
             self._engine = None
             self._session = None
 
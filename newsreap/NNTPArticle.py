@@ -208,9 +208,13 @@ class NNTPArticle(object):
 
         return True
 
-    def post_iter(self, update_headers=True):
+    def post_iter(self, update_headers=True, zero_copy=False):
         """
         Returns NNTP string as it would be required for posting
+
+        If zero_copy is set to True, then our decoded content is returned
+        as the NNTPContent() objects themselves (oppose to their content) so
+        that the caller can send them using sendfile().
         """
 
         if not self.id:
@@ -267,7 +271,8 @@ class NNTPArticle(object):
 
         if len(self.decoded):
             for entry in self.decoded:
-                args.append(iter(entry.post_iter()))
+                args.append(
+                    (entry, ) if zero_copy else iter(entry.post_iter()))
                 args.append(NNTP_EOL)
 
         return chain(*args)
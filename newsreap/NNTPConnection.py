@@ -47,6 +47,7 @@ from .SocketBase import SignalCaughtException
 from .Utils import mkdir
 from .Utils import SEEK_SET
 from .Utils import SEEK_END
+from .Utils import ZERO_COPY_SUPPORT
 from .NNTPnzb import NNTPnzb
 from .NNTPSettings import DEFAULT_TMP_DIR
 from .NNTPSettings import NNTP_EOL
@@ -417,6 +418,16 @@ class NNTPConnection(SocketBase):
         self._backups.append(connection)
         return True
 
+    def set_recv_bufsize(self, size):
+        """
+        Sets the receive buffer size of our connection and that of any
+        backup servers we've been assigned.
+        """
+        super(NNTPConnection, self).set_recv_bufsize(size)
+
+        for connection in self._backups:
+            connection.set_recv_bufsize(size)
+
     def connect(self, *args, **kwargs):
         """
         Establishes a connection to an NNTP Server
@@ -645,7 +656,12 @@ class NNTPConnection(SocketBase):
                 )
 
         # get an iterator
-        post_iter = article.post_iter(update_headers=update_headers)
+        post_iter = article.post_iter(
+            update_headers=update_headers,
+            # We can have our content sent by the kernel unless it needs to
+            # be encrypted first
+            zero_copy=ZERO_COPY_SUPPORT and not self.secure,
+        )
         if not post_iter:
             return NNTPResponse(
                 NNTPResponseCode.INVALID_INPUT,
@@ -661,12 +677,31 @@ class NNTPConnection(SocketBase):
 
         # If we reach here we're read to go
         xfer_total_bytes = 0
-        for chunk in post_iter:
-            xfer_bytes = super(NNTPConnection, self).send(chunk)
-            if xfer_bytes != len(chunk):
-                # uh-oh
-                return NNTPResponse(436, 'Transfer failed.')
-            xfer_total_bytes += xfer_bytes
+        for entry in post_iter:
+            if isinstance(entry, NNTPContent):
+                # Have the kernel send our content for us
+                xfer_bytes = entry.sendfile(self)
+                if xfer_bytes is None:
+                    # We need to send the content ourselves
+                    chunks = entry.post_iter()
+
+                elif xfer_bytes != len(entry):
+                    # uh-oh
+                    return NNTPResponse(436, 'Transfer failed.')
+
+                else:
+                    xfer_total_bytes += xfer_bytes
+                    continue
+
+            else:
+                chunks = (entry, )
+
+            for chunk in chunks:
+                xfer_bytes = super(NNTPConnection, self).send(chunk)
+                if xfer_bytes != len(chunk):
+                    # uh-oh
+                    return NNTPResponse(436, 'Transfer failed.')
+                xfer_total_bytes += xfer_bytes
 
         # Send our EOD and capture our response
         response = self.send(NNTP_EOL + NNTP_EOD)
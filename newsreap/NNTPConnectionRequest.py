@@ -18,6 +18,7 @@ import gevent.monkey
 gevent.monkey.patch_all()
 
 from newsreap.NNTPRequest import NNTPRequest
+from newsreap.NNTPConnection import NNTPConnection
 
 class NNTPConnectionRequest(NNTPRequest):
     """
@@ -55,22 +56,21 @@ class NNTPConnectionRequest(NNTPRequest):
         # Store our actions
         self.actions = actions
 
-
-    def run(self, connection, *args, **kwargs):
-        """
-        Executes actions and returns response object
-
-        """
-
+        # Normalize our actions into (name, args, kwargs) tuples once so
+        # that run() doesn't have to re-parse them for every execution
+        self._actions = []
         for action in self.actions:
-
-            if self.is_set():
-                # Early exit; we can't process a response that has already been
-                # set.  This flag is usually set remotely if aborting
-                return False
-
             _name = action[0]
-            _func = getattr(connection, _name)
+            if not isinstance(_name, basestring):
+                raise AttributeError(
+                    "Invalid action name specified (%s)." % str(_name))
+
+            if _name.startswith('_') or \
+                    not callable(getattr(NNTPConnection, _name, None)):
+                # Only the public functions of our connection can be called
+                raise AttributeError(
+                    "Invalid action specified; NNTPConnection has no public "
+                    "function named '%s'." % _name)
 
             # Handle Arguments
             try:
@@ -90,6 +90,34 @@ class NNTPConnectionRequest(NNTPRequest):
             except IndexError:
                 _kwargs = dict()
 
+            self._actions.append((_name, _args, _kwargs))
+
+
+    def _resolve(self, connection):
+        """
+        Resolves each of our actions against the connection specified
+        and returns a list of (bound_function, args, kwargs) tuples.
+
+        Doing this once up front saves us from performing an attribute
+        lookup on the connection for every action processed.
+        """
+        return [(getattr(connection, _name), _args, _kwargs)
+                for (_name, _args, _kwargs) in self._actions]
+
+
+    def run(self, connection, *args, **kwargs):
+        """
+        Executes actions and returns response object
+
+        """
+
+        for (_func, _args, _kwargs) in self._resolve(connection):
+
+            if self.is_set():
+                # Early exit; we can't process a response that has already been
+                # set.  This flag is usually set remotely if aborting
+                return False
+
             self.append(_func(*_args, **_kwargs))
 
         # Set our completion flag; this flags any blocking
@@ -18,8 +18,12 @@ import errno
 import hashlib
 import weakref
 
+from functools import total_ordering
 from os import unlink
 from os import fdopen
+from os import lseek
+from os import fstat
+from os import close as os_close
 from os.path import join
 from os.path import getsize
 from os.path import basename
@@ -28,16 +32,19 @@ from os.path import abspath
 from os.path import expanduser
 from os.path import isdir
 from os.path import isfile
-from io import BytesIO
+from mmap import mmap
+from mmap import ACCESS_READ
+from multiprocessing import cpu_count
 from tempfile import mkstemp
 from shutil import move as _move
-from shutil import copy as _copy
 from shutil import Error as ShutilError
 from zlib import crc32
 from blist import sortedset
+from gevent.threadpool import ThreadPool
 from types import MethodType
 
 from .codecs.CodecBase import DEFAULT_TMP_DIR
+from .codecs.CodecBase import BIN_MASK
 
 from .Utils import mkdir
 from .Utils import pushd
@@ -45,7 +52,11 @@ from .Utils import rm
 from .Utils import bytes_to_strsize
 from .Utils import strsize_to_bytes
 from .Utils import hexdump
+from .Utils import copy as _copy
+from .Utils import zero_copy
+from .Utils import ZERO_COPY_SUPPORT
 from .Utils import SEEK_SET
+from .Utils import SEEK_CUR
 from .Utils import SEEK_END
 
 from .Mime import Mime
@@ -57,6 +68,33 @@ import logging
 from .Logging import NEWSREAP_ENGINE
 logger = logging.getLogger(NEWSREAP_ENGINE)
 
+# The maximum number of parts split() will have the kernel write for it
+# at the same time (when zero-copy is supported).
+SPLIT_IO_DEPTH = 8
+
+# Small writes are collected in memory and written to our stream in one go
+# once they add up to this many bytes
+WRITE_BUFFER_SIZE = 65536
+
+# The checksums we cache (in _lazy_cache) and keep up to date as content
+# is written to the end of a file
+CACHED_CHECKSUMS = ('crc32', 'md5', 'sha1', 'sha256')
+
+# Freshly initialized hash objects our digests are copied from; this spares
+# us looking the algorithm up each time a new one is needed
+HASH_PROTOTYPES = {
+    'md5': hashlib.md5(),
+    'sha1': hashlib.sha1(),
+    'sha256': hashlib.sha256(),
+}
+
+# Content (yet to be hashed) of at least this many bytes is handed to our
+# checksums through a memory map in one go instead of being read in blocks
+HASH_MMAP_THRESHOLD = 1048576
+
+# The size of the blocks content is read in when it's fed to our checksums
+HASH_BLOCK_SIZE = 1048576
+
 
 class NNTPFileMode(object):
     """
@@ -71,7 +109,13 @@ class NNTPFileMode(object):
     ASCII_R = 'r'
     ASCII_RW = 'w+'
 
+    # The modes that allow us to read from the stream they opened
+    READABLE = (
+        BINARY_RO, BINARY_WO, BINARY_RW, BINARY_RW_TRUNCATE, ASCII_R, ASCII_RW,
+    )
+
 
+@total_ordering
 class NNTPContent(object):
     """
     An object for maintaining retrieved article content. There can only
@@ -92,6 +136,29 @@ class NNTPContent(object):
 
     """
 
+    # split() can spawn thousands of us; keeping our attributes in slots
+    # (oppose to a per instance dictionary) keeps our footprint small
+    __slots__ = (
+        'sort_no', '_unique', 'filename', '_filepath', 'filemode', 'work_dir',
+        'stream', '_wbuf', '_wbuf_len', '_wbuf_ptr', '_mmap_obj', '_detached', '_dirty',
+        '_is_valid', 'part', 'total_parts', '_begin', '_end', '_total_size',
+        '_block_size', '_parent', '_lazy_cache', '_isdir', '_key',
+        '__weakref__',
+    )
+
+    # The integer arguments we accept during initialization as the tuple:
+    #   (argument, attribute, default, strict)
+    #
+    # An invalid value raises an AttributeError if strict is set, otherwise
+    # the default is used in its place
+    _INT_FIELDS = (
+        ('part', 'part', 1, True),
+        ('total_parts', 'total_parts', None, True),
+        ('begin', '_begin', 0, True),
+        ('end', '_end', None, False),
+        ('total_size', '_total_size', None, True),
+    )
+
     def __init__(self, filepath=None, part=None, total_parts=None,
                  begin=None, end=None, total_size=None, work_dir=None,
                  sort_no=10000, unique=False, *args, **kwargs):
@@ -129,6 +196,9 @@ class NNTPContent(object):
             # the index is already in string format
             self._unique = str(id(self))
 
+        # Our cached key() as the tuple: (fields it was made from, key)
+        self._key = None
+
         # Default filename
         self.filename = ''
 
@@ -149,6 +219,18 @@ class NNTPContent(object):
         # A Stream object
         self.stream = None
 
+        # Small writes waiting to be written to our stream (and their
+        # combined length)
+        self._wbuf = []
+        self._wbuf_len = 0
+
+        # Where (in our stream) our buffered writes are to be written to
+        self._wbuf_ptr = 0
+
+        # A read-only memory map of our stream (populated on demand by
+        # _mmap()); it's released whenever our stream changes
+        self._mmap_obj = None
+
         # Detached prevents the article from cleaning up all of
         # the data it otherwise tracks (such as the article stored
         # on disk)
@@ -167,71 +249,40 @@ class NNTPContent(object):
         # if all is good, then we just leave the flag as is
         self._is_valid = False
 
-        # Store part
-        self.part = 1
-        if part is not None:
-            try:
-                self.part = int(part)
-
-            except (ValueError, TypeError):
-                raise AttributeError(
-                    "Invalid part specified (%s)." %
-                    str(part),
-                )
+        # Store our part, total_parts, begin, end and total_size
+        # - part and total_parts are mostly used for posting/encoding
+        # - begin and end track the indexes (head/tail) that make up the
+        #   block of data this NNTPContent object represents. These are
+        #   only used if split() is called
+        # - total_size tracks the size of all of the parts combined
+        for (name, attr, default, strict), value in zip(
+                self._INT_FIELDS,
+                (part, total_parts, begin, end, total_size)):
+
+            if value is not None:
+                try:
+                    value = int(value)
 
-        # Tracks parts (most used for posting/encoding)
-        self.total_parts = 1
-        if total_parts is not None:
-            try:
-                self.total_parts = int(total_parts)
+                except (ValueError, TypeError):
+                    if strict:
+                        raise AttributeError(
+                            "Invalid %s specified (%s)." % (name, str(value)),
+                        )
+                    value = default
+            else:
+                value = default
 
-            except (ValueError, TypeError):
-                raise AttributeError(
-                    "Invalid total_parts specified (%s)." %
-                    str(total_parts),
-                )
+            setattr(self, attr, value)
 
-            if self.total_parts < self.part:
-                raise AttributeError(
-                    "Invalid parts/total_parts specified (%s/%s)." % (
-                        str(part), str(total_parts),
-                    )
-                )
-        else:
+        if self.total_parts is None:
             self.total_parts = self.part
 
-        # Used for tracking the indexes (head/tail) that make
-        # up the block of data this NNTPContent object represents.
-        # this is only used if split() is called
-        self._begin = 0
-        if begin is not None:
-            try:
-                self._begin = int(begin)
-
-            except (ValueError, TypeError):
-                raise AttributeError(
-                    "Invalid begin specified (%s)." % str(begin),
-                )
-
-        self._end = None
-        if end is not None:
-            try:
-                self._end = int(end)
-
-            except (ValueError, TypeError):
-                self._end = None
-
-        # Tracks total_size (used for posting when we have parts of files
-        self._total_size = None
-        if total_size is not None:
-            try:
-                self._total_size = int(total_size)
-
-            except (ValueError, TypeError):
-                raise AttributeError(
-                    "Invalid total_size specified (%s)." %
-                    str(total_size),
+        elif self.total_parts < self.part:
+            raise AttributeError(
+                "Invalid parts/total_parts specified (%s/%s)." % (
+                    str(part), str(total_parts),
                 )
+            )
 
         # Set blocksize as a variable for those who want to tweak it
         # later on.  This controls the maximum amount of content read
@@ -246,11 +297,15 @@ class NNTPContent(object):
         # object as a reference.
         self._parent = None
 
-        # TODO: all md5, crc32, len() calls etc should all cache their results
-        # here and retrieve from here if present. If a write() or load() is
-        # made, the cache should be destroyed. The cache is only populated on
-        # demand.
-        self._lazy_cache = {}
+        # Results of calls such as len(), crc32(), md5(), etc are cached here.
+        # If a write() or load() is made, the cache is destroyed (or updated).
+        # The cache is only populated on demand (the dictionary itself isn't
+        # created until it's first needed).
+        #
+        # Checksums are stored as a (value, length) tuple where the value
+        # covers the first 'length' bytes of our content; they are kept up to
+        # date as content is written to the end of our file.
+        self._lazy_cache = None
 
         # NNTPContent supports directory storing too. This is toggle in the
         # event we're dealing with a directory
@@ -294,6 +349,21 @@ class NNTPContent(object):
                 # Store our filename
                 self.filename = basename(filepath)
 
+    @property
+    def filepath(self):
+        """
+        The path to our content on disk. Content still being held in memory
+        is written to disk the first time it's path is asked for.
+        """
+        if self._wbuf and self.stream is None:
+            self._flush_wbuf()
+
+        return self._filepath
+
+    @filepath.setter
+    def filepath(self, filepath):
+        self._filepath = filepath
+
     def getvalue(self):
         """
         This is mostly just used for unit testing, but it
@@ -304,15 +374,90 @@ class NNTPContent(object):
         and return it.
         """
 
+        if self.stream is None and self._wbuf:
+            # Our content is still being held in memory
+            if len(self._wbuf) > 1:
+                self._wbuf = [''.join(self._wbuf)]
+
+            return self._wbuf[0]
+
+        mm = self._mmap()
+        if mm is not None:
+            # Leave our pointer at the end of the file just like a read()
+            # would have
+            self.stream.seek(0, SEEK_END)
+            return mm[:]
+
         if not self.open(mode=NNTPFileMode.BINARY_RO, eof=False):
             # Error
             return None
 
         # Head of data
-        self.stream.seek(0L, SEEK_SET)
+        self.stream.seek(0, SEEK_SET)
 
         return self.read()
 
+    def _mmap(self):
+        """
+        Returns a read-only memory map of our file (opening it if nessisary).
+        The map is cached until the stream is written to, re-opened or
+        closed.
+
+        Pages are only loaded as they're accessed and are shared with the
+        page cache which makes this a cheaper way of scanning through our
+        content then read().
+
+        None is returned if the content can not be memory mapped (such as
+        empty files and streams in memory like BytesIO).
+        """
+        if self._mmap_obj is not None:
+            return self._mmap_obj
+
+        if not self.filepath or self._isdir:
+            return None
+
+        if not self._open_readable():
+            return None
+
+        try:
+            self._mmap_obj = mmap(self.stream.fileno(), 0, access=ACCESS_READ)
+
+        except (AttributeError, ValueError, EnvironmentError):
+            # Empty files can't be mapped (ValueError)
+            return None
+
+        return self._mmap_obj
+
+    def _open_readable(self):
+        """
+        Ensures our stream is open for reading; a stream that is already
+        open in a mode we can read from is used as is (oppose to it being
+        re-opened).
+
+        """
+        if self.stream is not None and \
+                self.filemode in NNTPFileMode.READABLE:
+            # Anything we've written must reach the file before it's read
+            # back (or memory mapped)
+            self._flush_wbuf()
+            self.stream.flush()
+            return True
+
+        return self.open(mode=NNTPFileMode.BINARY_RO, eof=False)
+
+    def _mmap_release(self):
+        """
+        Releases our memory map (if one was created).
+        """
+        if self._mmap_obj is not None:
+            try:
+                self._mmap_obj.close()
+
+            except (ValueError, EnvironmentError):
+                pass
+
+            self._mmap_obj = None
+
     def can_post(self):
         """
         Similar to is_valid() except only returns true if the item is
@@ -357,16 +502,49 @@ class NNTPContent(object):
             # Read and write
             mode = NNTPFileMode.BINARY_RW
 
+        if self.stream is None and self._wbuf:
+            # Up until now our content has only been held in memory; it's
+            # about to be written to disk
+            data = ''.join(self._wbuf)
+            self._wbuf = []
+            self._wbuf_len = 0
+
+            if not self.open(mode=NNTPFileMode.BINARY_RW):
+                # Hold on to what we have
+                self._wbuf = [data]
+                self._wbuf_len = len(data)
+                return False
+
+            self.stream.write(data)
+            self.stream.flush()
+
         if self.stream is not None:
+            # Write anything we're holding on to before we move around
+            self._flush_wbuf()
+
             if self.filemode is not None and self.filemode == mode:
+                # We're re-using our stream; but we're likely about to
+                # write to it so any memory map we have of it can no
+                # longer be trusted
+                self._mmap_release()
+
                 # ensure we're at the head of the file
                 if not eof:
-                    self.stream.seek(0L, SEEK_SET)
+                    self.stream.seek(0, SEEK_SET)
                 else:
-                    self.stream.seek(0L, SEEK_END)
+                    self.stream.seek(0, SEEK_END)
 
                 return weakref.ref(self.stream)
 
+        # Our stream is about to change so any memory map we have of it can
+        # no longer be trusted
+        self._mmap_release()
+
+        if mode in (NNTPFileMode.BINARY_WO_TRUNCATE,
+                    NNTPFileMode.BINARY_RW_TRUNCATE):
+            # Our content is about to be truncated
+            self._lazy_cache = None
+
         if not filepath and self.filepath:
             # Update filepath
             filepath = self.filepath
@@ -379,7 +557,7 @@ class NNTPContent(object):
             # Create a Temporary File
             fileno, self.filepath = mkstemp(dir=self.work_dir)
             try:
-                self.stream = fdopen(fileno, mode)
+                self.stream = fdopen(fileno, mode, self._block_size)
                 if self._detached is None:
                     self._detached = False
 
@@ -408,9 +586,13 @@ class NNTPContent(object):
             # expand our path to be absolute
             filepath = abspath(expanduser(filepath))
 
+            if filepath != self.filepath:
+                # We're switching to different content
+                self._lazy_cache = None
+
             # Create our stream
             try:
-                self.stream = open(filepath, mode)
+                self.stream = open(filepath, mode, self._block_size)
 
                 self.filepath = filepath
                 if self._detached is None:
@@ -439,6 +621,7 @@ class NNTPContent(object):
             # assume we're dealing with an already open stream and therefore
             # we work in a detached state
             self.stream = filepath
+            self._lazy_cache = None
             self.filepath = filepath.get('name')
             self.filemode = filepath.get('mode')
 
@@ -461,11 +644,11 @@ class NNTPContent(object):
 
         if not eof:
             # Ensure we're at the head of the file
-            self.stream.seek(0L, SEEK_SET)
+            self.stream.seek(0, SEEK_SET)
 
         else:
             # Ensure we're at the end of the file
-            self.stream.seek(0L, SEEK_END)
+            self.stream.seek(0, SEEK_END)
 
         return weakref.ref(self.stream)
 
@@ -538,6 +721,10 @@ class NNTPContent(object):
             # Close any existing open file
             self.close()
 
+        # Drop anything we were holding in memory
+        self._wbuf = []
+        self._wbuf_len = 0
+
         if self._detached is False and self.filepath:
             # We're changing so it's better we unlink this (but only if we're
             # attached to it)
@@ -556,41 +743,24 @@ class NNTPContent(object):
         # Reset Unique Flag
         self._unique = False
 
-        if isinstance(filepath, NNTPContent):
-            # Support NNTPContent object copying; by simply storing
-            # the object in a list, we are able to catch it in the
-            # next check
-            self.part = filepath.part
-            filepath = [filepath]
-
-        if isinstance(filepath, (tuple, set, sortedset, list)):
-            # Perform merge if we detected a set of NNTPContent objects
-            count = 0
-            for content in filepath:
-                if isinstance(content, NNTPContent):
-                    self.append(content)
-                    count += 1
-
-            if count == 0 or len(filepath) != count:
-                # Return True if we iterated over everything
-                return False
-
-            # update our filepath to be that of the file that was actually
-            # created
-            filepath = self.filepath
+        # Our content is changing
+        self._lazy_cache = None
 
-            # Our file is not detached in this state
-            self._detached = False
+        # Find the handler associated with the type of object we were passed
+        handler = self._LOAD_DISPATCH.get(type(filepath))
+        if handler is None:
+            # Support sub-classes of the types we know about
+            if isinstance(filepath, NNTPContent):
+                handler = NNTPContent._load_content
 
-        elif isdir(filepath):
-            # Toggle our flag and fall through as we support directories
-            self._isdir = True
+            elif isinstance(filepath, (tuple, set, sortedset, list)):
+                handler = NNTPContent._load_sequence
 
-        elif not isfile(filepath):
-            # we can't load the file so reset some common variables
-            self.filepath = None
-            self.filename = ''
+            else:
+                handler = NNTPContent._load_path
 
+        filepath = handler(self, filepath)
+        if filepath is None:
             return False
 
         # Assign new file
@@ -604,6 +774,72 @@ class NNTPContent(object):
 
         return True
 
+    def _load_content(self, content):
+        """
+        load() handler for NNTPContent() objects which are copied into an
+        'attached' NNTPContent() object.
+        """
+        # Support NNTPContent object copying; by simply storing the object in
+        # a list, we can treat it like any other sequence
+        self.part = content.part
+        return self._load_sequence([content])
+
+    def _load_sequence(self, contents):
+        """
+        load() handler for a tuple, set, sortedset or list of NNTPContent()
+        objects which are merged into a single 'attached' file.
+
+        The path to the merged file is returned, otherwise None is returned
+        if a problem occurred.
+        """
+        # Perform merge if we detected a set of NNTPContent objects
+        count = 0
+        for content in contents:
+            if isinstance(content, NNTPContent):
+                self.append(content)
+                count += 1
+
+        if count == 0 or len(contents) != count:
+            # We didn't iterate over everything
+            return None
+
+        # Our file is not detached in this state
+        self._detached = False
+
+        # our filepath is that of the file that was actually created
+        return self.filepath
+
+    def _load_path(self, filepath):
+        """
+        load() handler for paths to files and directories.
+
+        The path is returned, otherwise None is returned if it could not be
+        loaded.
+        """
+        if isdir(filepath):
+            # Toggle our flag and fall through as we support directories
+            self._isdir = True
+
+        elif not isfile(filepath):
+            # we can't load the file so reset some common variables
+            self.filepath = None
+            self.filename = ''
+
+            return None
+
+        return filepath
+
+    # Maps the type of object passed into load() to the handler responsible
+    # for it; sub-classes of these types are resolved by load() itself
+    _LOAD_DISPATCH = {
+        str: _load_path,
+        unicode: _load_path,
+        tuple: _load_sequence,
+        set: _load_sequence,
+        sortedset: _load_sequence,
+        list: _load_sequence,
+    }
+
     def copy(self):
         """
         copy is very close to save(); this is especially the case since
@@ -630,7 +866,10 @@ class NNTPContent(object):
 
         with pushd(self.work_dir, create_if_missing=True):
             # mkstemp used to genrate an unused temporary file
-            _, filepath = mkstemp(dir=self.work_dir)
+            fileno, filepath = mkstemp(dir=self.work_dir)
+
+            # We don't need the descriptor it opened for us
+            os_close(fileno)
             try:
                 # Remove the created file to silence any warnings
                 # from the save() call coming next
@@ -674,6 +913,10 @@ class NNTPContent(object):
         that was last loaded is saved to instead and the file is automatically
         detached from the Object.
         """
+        if self.stream is None and self._wbuf:
+            # Our content has only been held in memory so far
+            self._flush_wbuf()
+
         if filepath:
             if not isfile(filepath):
                 # If the file wasn't found relative to where we are, we'll try
@@ -771,7 +1014,10 @@ class NNTPContent(object):
         """
         if not self.filepath:
             # Create a Temporary File
-            _, self.filepath = mkstemp(dir=self.work_dir)
+            fileno, self.filepath = mkstemp(dir=self.work_dir)
+
+            # We don't need the descriptor it opened for us
+            os_close(fileno)
 
         return self.filepath
 
@@ -804,119 +1050,131 @@ class NNTPContent(object):
         if not mem_buf or mem_buf < 0:
             return None
 
-        # Initialize Part #
-        part = 0
-
         # Initialize Total Part #
-        total_parts, partial = divmod(len(self), size)
+        total_parts, partial = divmod(file_size, size)
         if partial:
             total_parts += 1
 
-        # A lists of NNTPContent() objects to return
-        objs = sortedset(key=lambda x: x.key())
+        # A lists of NNTPContent() objects to return; our parts are generated
+        # in order so we only need to build our sortedset once at the end
+        objs = []
 
         if not self.open(mode=NNTPFileMode.BINARY_RO):
             return None
 
-        # Calculate the total length of our data
-        total_size = len(self)
-
-        # File length of our first object
-        f_length = 0
-
-        # Total Bytes Read
-        total_bytes = 0
-
-        # Initialize dummy value
-        obj = None
-
-        # Now read our chunks as per our memory restrictions
-        while True:
-
-            if total_bytes == 0:
-                # Read memory chunk
-                data = BytesIO(self.stream.read(mem_buf-total_bytes))
-
-                # Retrieve length of our buffer
-                total_bytes = data.seek(0L, SEEK_END)
-
-                # Reset our pointer to the head of our data stream
-                data.seek(0L, SEEK_SET)
-
-                if total_bytes == 0:
-                    if f_length > 0:
-                        # Store our last object before we wrap up
-                        obj.close()
-                        objs.add(obj)
-                    # Return our list of NNTPContent() objects
-                    return objs
-
-            while total_bytes > 0 and size-f_length > 0:
-                # Store content up to our alotted amount
-                block_size = size-f_length
-                if total_bytes < block_size:
-                    block_size = total_bytes
-
-                if f_length == 0:
-
-                    # Create a new object
-                    obj = NNTPContent(
-                        filepath=self.filename,
-                        part=part+1,
-                        total_parts=total_parts,
-                        begin=(part*size),
-                        end=((part*size)+size),
-                        total_size=total_size,
-                        work_dir=self.work_dir,
-                        sort_no=self.sort_no,
-                    )
+        # When zero-copy is supported our parts are handed off to the kernel
+        # in batches where they're written in parallel; otherwise we write
+        # them one at a time
+        pool = None
+        io_depth = 1
+        if ZERO_COPY_SUPPORT and total_parts > 1:
+            io_depth = min(total_parts, SPLIT_IO_DEPTH)
+            pool = ThreadPool(io_depth)
+
+        # Parts we've started writing but have yet to complete
+        pending = []
+
+        # A buffer we re-use (if we have to copy the content ourselves)
+        mv = None
+        buf_size = min(mem_buf, size)
+
+        # The index of our last part
+        last_part = total_parts - 1
+
+        # The running offset of the next part we create
+        begin = 0
+
+        try:
+            for part in range(total_parts):
+                # The offset and length of the block of data this part
+                # represents
+                offset = begin
+                length = min(size, file_size - offset)
+                begin += length
+
+                # Create a new object; we don't pass our filename in as the
+                # filepath since there is nothing on disk for it to probe
+                # for (or load); the part is written to a temporary file
+                obj = NNTPContent(
+                    part=part+1,
+                    total_parts=total_parts,
+                    begin=offset,
+                    end=begin,
+                    total_size=file_size,
+                    work_dir=self.work_dir,
+                    sort_no=self.sort_no,
+                )
+                obj.filename = self.filename
 
-                    # Increment our part
-                    part += 1
+                # Create a pointer to the parent
+                obj._parent = weakref.proxy(self)
 
-                    # Create a pointer to the parent
-                    obj._parent = weakref.proxy(self)
+                # Open the new file
+                obj.open(mode=NNTPFileMode.BINARY_WO_TRUNCATE)
 
-                    # Open the new file
-                    obj.open(mode=NNTPFileMode.BINARY_WO_TRUNCATE)
+                pending.append((
+                    obj, offset, length, None if pool is None else
+                    pool.spawn(obj._sendfile, self.stream, offset, length),
+                ))
 
-                try:
-                    obj.write(data.read(block_size))
-
-                except IOError, e:
-                    if e[0] is errno.ENOSPC:
-                        # most probably a disk space issue
-                        logger.error(
-                            'Ran out of disk space while writing %s.' %
-                            (obj.filepath),
-                        )
-                    else:
-                        # most probably a disk space issue
-                        logger.error(
-                            'An I/O error '
-                            '(%d) occured while writing %s to disk.' %
-                            (e[0], obj.filepath),
-                        )
+                while pending and (
+                        len(pending) >= io_depth or part == last_part):
 
-                    # Tidy
-                    self.close()
+                    # Complete the oldest part we started
+                    obj, offset, length, result = pending.pop(0)
+                    if result is None:
+                        result = obj._sendfile(self.stream, offset, length)
 
-                    # Return None
-                    return None
+                    else:
+                        # Wait for the kernel to finish writing our part
+                        result = result.get()
+
+                    if result is None:
+                        # Zero-copy isn't possible; copy the content
+                        # ourselves as per our memory restrictions
+                        if mv is None:
+                            mv = memoryview(bytearray(buf_size))
+
+                        self.stream.seek(offset, SEEK_SET)
+                        while length > 0:
+                            bytes_read = self.stream.readinto(
+                                mv if length >= buf_size else mv[:length])
+                            if not bytes_read:
+                                break
+
+                            obj.write(mv[:bytes_read])
+                            length -= bytes_read
+
+                    obj.close()
+                    objs.append(obj)
+
+        except (IOError, OSError) as e:
+            if e.errno == errno.ENOSPC:
+                # most probably a disk space issue
+                logger.error(
+                    'Ran out of disk space while writing %s.' %
+                    (obj.filepath),
+                )
+            else:
+                # most probably a disk space issue
+                logger.error(
+                    'An I/O error '
+                    '(%d) occured while writing %s to disk.' %
+                    (e.errno, obj.filepath),
+                )
 
-                f_length += block_size
-                total_bytes -= block_size
+            # Tidy
+            self.close()
 
-            if f_length == size:
-                # We're done
-                obj.close()
-                objs.add(obj)
+            # Return None
+            return None
 
-                # File length reset
-                f_length = 0
+        finally:
+            if pool is not None:
+                pool.kill()
 
-        # code will never reach here
-        return None
+        # Return our list of NNTPContent() objects
+        return sortedset(objs, key=lambda x: x.key())
 
     def write(self, data, eof=True):
         """
@@ -928,11 +1186,66 @@ class NNTPContent(object):
         placed at the end of the stream.
 
         """
-        if self.stream is None:
-            # open the file if it's not already open
-            self.open(mode=NNTPFileMode.BINARY_RW, eof=eof)
+        if self.stream is None and (
+                (self._filepath and not self._wbuf) or type(data) is not str or
+                self._wbuf_len + len(data) >= WRITE_BUFFER_SIZE):
+            # open the file if it's not already open; content we've been
+            # holding in memory is always written to
+            self.open(
+                mode=NNTPFileMode.BINARY_RW, eof=eof or bool(self._wbuf))
+
+        # Our content is changing
+        self._mmap_release()
+
+        if self._lazy_cache:
+            # Track where our data is going to be written to
+            if self.stream is None:
+                ptr = self._wbuf_len
+
+            elif self._wbuf:
+                ptr = self._wbuf_ptr + self._wbuf_len
+
+            else:
+                ptr = self.stream.tell()
+
+        if type(data) is str and \
+                self._wbuf_len + len(data) < WRITE_BUFFER_SIZE:
+            # Hold on to small writes so we can write them all at once; if
+            # we haven't got a stream yet then this is where our content
+            # lives until it grows too large to be kept in memory
+            if not self._wbuf and self.stream is not None:
+                # Our stream can be moved around before we write what
+                # we're holding on to; so we track where it belongs
+                self._wbuf_ptr = self.stream.tell()
+
+            self._wbuf.append(data)
+            self._wbuf_len += len(data)
+            response = None
+
+        else:
+            self._flush_wbuf()
+            response = self.stream.write(data)
 
-        response = self.stream.write(data)
+        if self._lazy_cache:
+            # Keep our cached checksums up to date
+            for key in CACHED_CHECKSUMS:
+                if key not in self._lazy_cache:
+                    continue
+
+                value, length = self._lazy_cache[key]
+                if ptr == length:
+                    # We're writing to the end of the content our checksum
+                    # covers so we can keep it up to date
+                    if key == 'crc32':
+                        value = crc32(data, value)
+                    else:
+                        value.update(data)
+
+                    self._lazy_cache[key] = (value, length + len(data))
+
+                elif ptr < length:
+                    # We've over-written content our checksum covers
+                    del self._lazy_cache[key]
 
         if not self._dirty:
             # Set dirty flag
@@ -944,21 +1257,64 @@ class NNTPContent(object):
 
         return response
 
+    def _flush_wbuf(self):
+        """
+        Writes any data being held by write() to our stream.
+        """
+        if self._wbuf and self.stream is None:
+            # Our content has only been held in memory so far; open() takes
+            # care of writing it to disk for us
+            self.open(mode=NNTPFileMode.BINARY_RW, eof=True)
+
+        elif self._wbuf:
+            # Our stream may have been moved since our data was written to
+            # us; if so, we put it back where we found it afterwards
+            ptr = self.stream.tell()
+            self.stream.seek(self._wbuf_ptr, SEEK_SET)
+            self.stream.write(''.join(self._wbuf))
+            if ptr != self._wbuf_ptr:
+                self.stream.seek(ptr, SEEK_SET)
+
+            self._wbuf = []
+            self._wbuf_len = 0
+
     def read(self, n=-1):
         """
         read up to n bytes from the stream
         """
+        self._flush_wbuf()
+
         if self.stream is None:
             # open the file if it's not already open
             self.open(mode=NNTPFileMode.BINARY_RO, eof=False)
 
+        if n < 0 and self.filemode == NNTPFileMode.BINARY_RO:
+            # Read the remainder of our file through our memory map
+            ptr = self.stream.tell()
+            mm = self._mmap()
+            if mm is not None:
+                self.stream.seek(0, SEEK_END)
+                return mm[ptr:]
+
+            # Restore our pointer
+            self.stream.seek(ptr, SEEK_SET)
+
         return self.stream.read(n)
 
     def close(self):
         """
         Closes the file but retains any attachment to it.
         """
+        self._mmap_release()
+
+        if self.stream is None and self._wbuf:
+            # Content we're still holding in memory is written to disk so
+            # that it can be read back once we're re-opened
+            self._flush_wbuf()
+
         if self.stream is not None:
+            self._flush_wbuf()
+
             try:
                 self.stream.close()
                 if self.filepath:
@@ -990,6 +1346,9 @@ class NNTPContent(object):
         if not self.open(mode=NNTPFileMode.BINARY_WO, eof=True):
             return False
 
+        # A buffer we re-use (if we have to copy the content ourselves)
+        mv = None
+
         for entry in content:
             if isinstance(entry, NNTPContent):
                 # Just append the current content
@@ -999,18 +1358,89 @@ class NNTPContent(object):
 
                 logger.debug('Appending content %s' % entry)
 
-                while True:
-                    buf = entry.stream.read(self._block_size)
-                    if not buf:
-                        # Set dirty flag
-                        self._dirty = True
-                        break
-                    self.stream.write(buf)
+                if self._sendfile(entry.stream) is None:
+                    # Zero-copy isn't possible; copy the content ourselves
+                    if mv is None:
+                        mv = memoryview(bytearray(self._block_size))
+
+                    while True:
+                        bytes_read = entry.stream.readinto(mv)
+                        if not bytes_read:
+                            break
+                        self.stream.write(mv[:bytes_read])
+
+                # Set dirty flag
+                self._dirty = True
+
+                # Our content has grown
+                self._mmap_release()
 
                 entry.close()
 
         return True
 
+    def truncate(self, size=None):
+        """
+        Truncates our stream to the size specified (or to the current
+        position if no size is specified).
+        """
+        if self.stream is None:
+            return None
+
+        self._flush_wbuf()
+
+        # Our content is changing
+        self._mmap_release()
+        self._lazy_cache = None
+
+        if size is None:
+            return self.stream.truncate()
+
+        return self.stream.truncate(size)
+
+    def _sendfile(self, src, offset=0, length=None):
+        """
+        Copies the content of the src stream (starting at the offset
+        specified) to our own stream at its current position. If a length
+        isn't specified, then everything up to the end of the src stream
+        is copied.
+
+        The copy is handed off to the kernel (via sendfile()) so that the
+        data never has to pass through Python.
+
+        The function returns the number of bytes copied or None if a zero
+        copy could not be performed (in which case nothing was written and
+        the caller should copy the content itself).
+        """
+        if not ZERO_COPY_SUPPORT:
+            return None
+
+        try:
+            src_fd = src.fileno()
+            dst_fd = self.stream.fileno()
+
+        except (AttributeError, ValueError, IOError, OSError):
+            # We're dealing with a stream in memory like a BytesIO stream
+            return None
+
+        # Flush any content still in our buffer before we write around it
+        self._flush_wbuf()
+        self.stream.flush()
+
+        copied = zero_copy(dst_fd, src_fd, offset, length)
+        if copied is None:
+            # Zero-copy isn't possible
+            return None
+
+        # Our file descriptor was advanced behind the back of our stream
+        # object; keep them in sync
+        self.stream.seek(lseek(dst_fd, 0, SEEK_CUR), SEEK_SET)
+
+        # Our content has changed
+        self._mmap_release()
+
+        return copied
+
     def begin(self):
         """
         Returns the beginning ptr; this is nessisary when building encoded
@@ -1071,6 +1501,10 @@ class NNTPContent(object):
         if self.stream is not None:
             self.close()
 
+        # Drop anything we were holding in memory
+        self._wbuf = []
+        self._wbuf_len = 0
+
         if self.filepath:
             return rm(self.filepath)
 
@@ -1081,14 +1515,20 @@ class NNTPContent(object):
         Returns a key that can be used for sorting with:
             lambda x : x.key()
         """
+        # Our key is only regenerated if what it's made up of changes
+        fields = (self.sort_no, self.filename, self.part, self._unique)
+        if self._key is not None and self._key[0] == fields:
+            return self._key[1]
+
         if self.part is not None:
             result = '%.5d/%s/%.5d' % (self.sort_no, self.filename, self.part)
         else:
             result = '%.5d/%s//' % (self.sort_no, self.filename)
 
         if self._unique is not False:
-            return result + self._unique
+            result += self._unique
 
+        self._key = (fields, result)
         return result
 
     def post_iter(self, block_size=BLOCK_SIZE):
@@ -1107,27 +1547,70 @@ class NNTPContent(object):
                 yield data
             self.close()
 
+    def sendfile(self, sock):
+        """
+        Sends our content down the (SocketBase) socket specified without it
+        passing through Python (when possible).
+
+        The number of bytes sent is returned or None if the content could
+        not be sent this way; in which case nothing was sent and post_iter()
+        should be used instead.
+
+        Our stream is left the way we found it; if we had to open it, it's
+        closed again once we're done.
+        """
+        was_open = self.stream is not None
+        if not self._open_readable():
+            return None
+
+        try:
+            try:
+                fileno = self.stream.fileno()
+
+            except (AttributeError, ValueError, EnvironmentError):
+                # We're dealing with a stream in memory like a BytesIO stream
+                return None
+
+            return sock.sendfile(fileno, 0, len(self))
+
+        finally:
+            if not was_open:
+                self.close()
+
     def crc32(self):
         """
         A little bit old-fashioned, but some encodings like yEnc require that
         a crc32 value be used.  This calculates it based on the file
+
+        The result is cached; only content added to the end of the file
+        since the last call is read when the crc32 is requested again.
         """
-        # block size defined as 2**16
-        block_size = 65536
+        # Flushes any pending writes and gets our length
+        length = len(self)
 
-        # The mask to apply to all CRC checking
-        BIN_MASK = 0xffffffffL
+        if self._lazy_cache is None:
+            self._lazy_cache = {}
 
-        # Initialize
-        _crc = 0
+        # Initialize (using what we've already calculated if we can)
+        _crc, offset = self._lazy_cache.get('crc32', (0, 0))
+        if offset > length:
+            # Our content shrunk on us
+            _crc, offset = (0, 0)
 
-        if self.open(mode=NNTPFileMode.BINARY_RO):
-            for chunk in iter(lambda: self.stream.read(block_size), b''):
+        if offset < length:
+            if not self._open_readable():
+                return None
+
+            # Only read what we haven't already calculated; large content
+            # is handed to zlib in one go (through our memory map)
+            for chunk in self._hash_blocks(offset, length):
                 _crc = crc32(chunk, _crc)
+                offset += len(chunk)
 
-            return format(_crc & BIN_MASK, '08x')
+        # Cache our results
+        self._lazy_cache['crc32'] = (_crc, offset)
 
-        return None
+        return format(_crc & BIN_MASK, '08x')
 
     def mime(self):
         """
@@ -1157,13 +1640,7 @@ class NNTPContent(object):
 
         If the file can't be accessed, then None is returned.
         """
-        md5 = hashlib.md5()
-        if self.open(mode=NNTPFileMode.BINARY_RO):
-            for chunk in \
-                    iter(lambda: self.stream.read(128*md5.block_size), b''):
-                md5.update(chunk)
-            return md5.hexdigest()
-        return None
+        return self._hexdigest('md5')
 
     def sha1(self):
         """
@@ -1171,13 +1648,7 @@ class NNTPContent(object):
 
         If the file can't be accessed, then None is returned.
         """
-        sha1 = hashlib.sha1()
-        if self.open(mode=NNTPFileMode.BINARY_RO):
-            for chunk in \
-                    iter(lambda: self.stream.read(128*sha1.block_size), b''):
-                sha1.update(chunk)
-            return sha1.hexdigest()
-        return None
+        return self._hexdigest('sha1')
 
     def sha256(self):
         """
@@ -1185,19 +1656,129 @@ class NNTPContent(object):
 
         If the file can't be accessed, then None is returned.
         """
-        sha256 = hashlib.sha256()
-        if self.open(mode=NNTPFileMode.BINARY_RO):
-            for chunk in \
-                    iter(lambda: self.stream.read(128*sha256.block_size), b''):
-                sha256.update(chunk)
-            return sha256.hexdigest()
-        return None
+        return self._hexdigest('sha256')
+
+    def _hexdigest(self, name):
+        """
+        Returns the hexdigest of the hashlib algorithm identified by name.
+
+        If the file can't be accessed, then None is returned.
+        """
+        results = self.digests((name, ))
+        if results is None:
+            return None
+
+        return results[name]
+
+    def digests(self, names=('md5', 'sha1', 'sha256')):
+        """
+        Returns a dictionary of the hexdigests of the hashlib algorithms
+        identified by names (any of md5, sha1 and sha256).
+
+        All of the digests are calculated together in a single pass over our
+        content. The hash objects are cached; only content added to the end
+        of the file since the last call is read when a digest is requested
+        again.
+
+        If the file can't be accessed, then None is returned.
+        """
+        # Flushes any pending writes and gets our length
+        length = len(self)
+
+        if self._lazy_cache is None:
+            self._lazy_cache = {}
+
+        # Initialize (using what we've already calculated if we can)
+        hashes = {}
+        for name in names:
+            _hash, offset = self._lazy_cache.get(name, (None, 0))
+            if _hash is None or offset > length:
+                _hash, offset = (HASH_PROTOTYPES[name].copy(), 0)
+
+            hashes[name] = [_hash, offset]
+
+        # Only read what we haven't already calculated
+        ptr = min([offset for _, offset in hashes.itervalues()] or [length])
+        if ptr < length:
+            if not self._open_readable():
+                return None
+
+            for chunk in self._hash_blocks(ptr, length):
+                ptr += len(chunk)
+                for entry in hashes.itervalues():
+                    _hash, offset = entry
+                    if offset >= ptr:
+                        # This hash is already ahead of us
+                        continue
+
+                    # Only feed the hash what it hasn't seen already
+                    skip = offset - (ptr - len(chunk))
+                    _hash.update(buffer(chunk, skip) if skip > 0 else chunk)
+                    entry[1] = ptr
+
+        results = {}
+        for name, (_hash, offset) in hashes.items():
+            # Cache our results
+            self._lazy_cache[name] = (_hash, offset)
+            results[name] = _hash.hexdigest()
+
+        return results
+
+    def _hash_blocks(self, offset, length):
+        """
+        A generator returning the content of our (already opened) stream
+        from the offset specified to be fed into our checksums. The pointer
+        of our stream is left where it was once we're done.
+
+        Large content is returned all at once by referencing our memory
+        map; otherwise it's read in blocks of HASH_BLOCK_SIZE into a buffer
+        that is re-used for each block (so each block must be consumed before
+        the next one is requested).
+        """
+        ptr = self.stream.tell()
+
+        try:
+            if length - offset >= HASH_MMAP_THRESHOLD:
+                mm = self._mmap()
+                if mm is not None:
+                    yield buffer(mm, offset)
+                    return
+
+            self.stream.seek(offset, SEEK_SET)
+            if not hasattr(self.stream, 'readinto'):
+                # We're dealing with a stream like StringIO
+                while True:
+                    chunk = self.stream.read(HASH_BLOCK_SIZE)
+                    if not chunk:
+                        break
+
+                    yield chunk
+                return
+
+            buf = bytearray(min(HASH_BLOCK_SIZE, max(length - offset, 1)))
+            while True:
+                bytes_read = self.stream.readinto(buf)
+                if not bytes_read:
+                    break
+
+                yield buffer(buf, 0, bytes_read)
+
+        finally:
+            # Put our pointer back where we found it
+            self.stream.seek(ptr, SEEK_SET)
 
     def tell(self):
         """
         Allows reference to our object from within a Codec()
 
         """
+        if self.stream is None and self._wbuf:
+            # Our content is still being held in memory
+            return self._wbuf_len
+
+        if self.stream is not None:
+            self._flush_wbuf()
+
         if not self.filepath:
             # If there is no filepath, then we're probably dealing with a
             # stream in memory like a StringIO or BytesIO stream.
@@ -1222,6 +1803,8 @@ class NNTPContent(object):
         """
         if not self.stream:
             return ''
+
+        self._flush_wbuf()
         return self.stream.readline(*args, **kwargs)
 
     def next(self):
@@ -1261,6 +1844,13 @@ class NNTPContent(object):
         """
         Returns the length of the content
         """
+        if self.stream is None and self._wbuf:
+            # Our content is still being held in memory
+            return self._wbuf_len
+
+        if self.stream is not None:
+            self._flush_wbuf()
+
         if not self.filepath:
             # If there is no filepath, then we're probably dealing with a
             # stream in memory like a StringIO or BytesIO stream.
@@ -1268,7 +1858,7 @@ class NNTPContent(object):
                 # Advance to the end of the file
                 ptr = self.stream.tell()
                 # Advance to the end of the file and get our length
-                length = self.stream.seek(0L, SEEK_END)
+                length = self.stream.seek(0, SEEK_END)
                 if length != ptr:
                     # Return our pointer
                     self.stream.seek(ptr, SEEK_SET)
@@ -1277,12 +1867,22 @@ class NNTPContent(object):
                 # yet at all so just return 0
                 length = 0
         else:
-            if self.stream and self._dirty is True:
+            # Our size is never cached; our file can be changed in ways we
+            # don't see (written to through our stream directly or rewritten
+            # by another process such as a par2 repair)
+            if self.stream:
+                # Anything written to our stream (by us or not) must reach
+                # our file before we can size it
                 self.stream.flush()
                 self._dirty = False
 
-            # Get the size
-            length = getsize(self.filepath)
+            # Get the size (through our stream if we can to spare ourselves
+            # resolving our path again)
+            try:
+                length = fstat(self.stream.fileno()).st_size
+
+            except (AttributeError, ValueError, EnvironmentError):
+                length = getsize(self.filepath)
 
         return length
 
@@ -1298,7 +1898,7 @@ class NNTPContent(object):
             return None
 
         # Head of data
-        self.stream.seek(0L, SEEK_SET)
+        self.stream.seek(0, SEEK_SET)
 
         if not max_bytes:
             return hexdump(self.read())
@@ -1313,21 +1913,27 @@ class NNTPContent(object):
         if self.stream is not None:
             self.close()
 
-        if not self._detached and self.filepath:
+        if not self._detached and self._filepath:
             # We need to do some cleanup
-            rm(self.filepath)
+            rm(self._filepath)
 
     def __lt__(self, other):
         """
         Support Less Than (<) operator for sorting
         """
-        return self.key() < self.key()
+        return self.key() < other.key()
+
+    def __eq__(self, other):
+        """
+        Support equality (==) checks
+        """
+        return self.key() == other.key()
 
-    def __cmp__(self, content):
+    def __ne__(self, other):
         """
-        Support comparative checks
+        Support inequality (!=) checks
         """
-        return cmp(self.key(), content.key())
+        return not self.__eq__(other)
 
     def __str__(self):
         """
@@ -1379,3 +1985,32 @@ class NNTPContent(object):
                 self.filename,
                 bytes_to_strsize(len(self)),
             )
+
+
+def hash_many(contents, name='sha256', max_workers=None):
+    """
+    Returns a list of the checksums (identified by name; any of crc32, md5,
+    sha1 and sha256) of each of the NNTPContent objects specified in the
+    order they were provided.
+
+    The content is hashed in parallel by a pool of threads (one per cpu if
+    max_workers isn't specified); each content object reads through it's
+    own stream and both hashlib and zlib release the GIL while they work on
+    large blocks of data.
+    """
+    contents = list(contents)
+
+    if not max_workers:
+        max_workers = cpu_count()
+
+    max_workers = min(max_workers, len(contents))
+    if max_workers <= 1:
+        # Nothing to be gained by using our threads
+        return [getattr(content, name)() for content in contents]
+
+    pool = ThreadPool(max_workers)
+    try:
+        return pool.map(lambda content: getattr(content, name)(), contents)
+
+    finally:
+        pool.kill()
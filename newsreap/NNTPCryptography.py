@@ -27,13 +27,18 @@ from cryptography.hazmat.primitives.asymmetric import padding
 from cryptography.exceptions import UnsupportedAlgorithm
 
 from os.path import isfile
-
-from base64 import b64encode
-from base64 import b64decode
-from StringIO import StringIO
-from gzip import GzipFile
-
-from newsreap.Utils import SEEK_SET
+from hashlib import sha256
+from multiprocessing import cpu_count
+from gevent.threadpool import ThreadPool
+
+from binascii import b2a_base64
+from binascii import a2b_base64
+from binascii import Error as BinasciiError
+from zlib import compressobj
+from zlib import decompress
+from zlib import DEFLATED
+from zlib import MAX_WBITS
+from zlib import error as ZlibError
 
 # Logging
 import logging
@@ -49,6 +54,10 @@ SSL_WRITE_BLOCKSIZE = 16384
 # end
 DEFAULT_KEYFILE = "~/newsreap-rsa_id"
 
+# The zlib window bits that have our keys compressed/decompressed in the gzip
+# format (with it's header and trailer) just as a GzipFile() would have
+GZIP_WBITS = 16 + MAX_WBITS
+
 
 class KeySize(object):
     """
@@ -139,6 +148,42 @@ CRYPTOGRAPHY_HASH_MAP = {
 # The default Hash to use
 CRYPTOGRAPHY_DEFAULT_HASH = HashType.SHA256
 
+# The OAEP padding objects used for encryption and decryption are the same
+# for any given hash and mask generation function; so we only build them once
+# and store them here keyed by (hash function, mgf1 hash function)
+OAEP_PADDING_CACHE = {}
+
+# The version of the SSL library our cryptography backend is linked against;
+# it's looked up (and checked) the first time it's needed
+OPENSSL_VERSION = None
+
+
+def openssl_version():
+    """
+    Returns the version of the SSL library our cryptography backend is
+    linked against (None is returned if it could not be determined).
+
+    LibreSSL performs noticeably worse then OpenSSL does on the same
+    hardware, so a warning is logged the first time we detect it.
+
+    """
+    global OPENSSL_VERSION
+
+    if OPENSSL_VERSION is None:
+        try:
+            OPENSSL_VERSION = default_backend().openssl_version_text()
+
+        except AttributeError:
+            # Our version of cryptography can't tell us
+            OPENSSL_VERSION = ''
+
+        if 'LibreSSL' in OPENSSL_VERSION:
+            logger.warning(
+                'Cryptography is using %s; '
+                'OpenSSL will provide better performance.' % OPENSSL_VERSION)
+
+    return OPENSSL_VERSION if OPENSSL_VERSION else None
+
 
 class NNTPCryptography(object):
     def __init__(self, private_key=None, public_key=None, password=None,
@@ -164,6 +209,19 @@ class NNTPCryptography(object):
         # Mask generation functions
         self.mgf1 = mgf1
 
+        # Our serialized keys are cached as the tuple: (key, pem); the cache
+        # is only used if the key it was generated from is still in use.
+        # Private pems are further keyed by the password that protects them
+        self._public_pem = None
+        self._private_pem = None
+
+        # Our public key thumbprint is cached as the tuple: (key, thumbprint)
+        self._thumbprint = None
+
+        # Let the user know if our backend isn't performing as well as it
+        # could be (this is only checked once)
+        openssl_version()
+
         if self.private_key is not None:
             if not self.load(private_key, private_key, password):
                 raise ValueError('Could not load specified keys')
@@ -175,15 +233,7 @@ class NNTPCryptography(object):
         return it.
 
         """
-        fileobj = StringIO()
-        with GzipFile(fileobj=fileobj, mode="wb") as f:
-            try:
-                f.write(self.public_pem())
-            except TypeError:
-                # It wasn't initialized yet
-                return None
-
-        return b64encode(fileobj.getvalue())
+        return self.__gzip_encode(self.public_pem())
 
     def encode_private_key(self):
         """
@@ -192,14 +242,7 @@ class NNTPCryptography(object):
         return it.
 
         """
-        fileobj = StringIO()
-        with GzipFile(fileobj=fileobj, mode="wb") as f:
-            try:
-                f.write(self.private_pem())
-            except TypeError:
-                # It wasn't initialized yet
-                return None
-        return b64encode(fileobj.getvalue())
+        return self.__gzip_encode(self.private_pem())
 
     def decode_private_key(self, encoded):
         """
@@ -207,18 +250,7 @@ class NNTPCryptography(object):
         with base64 applied to it.  We decode it and load it.
 
         """
-
-        fileobj = StringIO()
-        try:
-            fileobj.write(b64decode(encoded))
-        except TypeError:
-            return False
-
-        fileobj.seek(0L, SEEK_SET)
-        private_key = None
-        with GzipFile(fileobj=fileobj, mode="rb") as f:
-            private_key = f.read()
-
+        private_key = self.__gzip_decode(encoded)
         if not private_key:
             return False
 
@@ -234,23 +266,19 @@ class NNTPCryptography(object):
         with base64 applied to it.  We decode it and load it.
 
         """
-        fileobj = StringIO()
-        try:
-            fileobj.write(b64decode(encoded))
-        except TypeError:
+        self.public_key = None
+        public_key = self.__gzip_decode(encoded)
+        if not public_key:
             return False
 
-        fileobj.seek(0L, SEEK_SET)
-        self.public_key = None
-        with GzipFile(fileobj=fileobj, mode="rb") as f:
-            try:
-                self.public_key = serialization.load_pem_public_key(
-                    f.read(),
-                    backend=default_backend()
-                )
-            except ValueError:
-                # Could not decrypt content
-                return False
+        try:
+            self.public_key = serialization.load_pem_public_key(
+                public_key,
+                backend=default_backend()
+            )
+        except ValueError:
+            # Could not decrypt content
+            return False
 
         if not self.public_key:
             return False
@@ -278,24 +306,9 @@ class NNTPCryptography(object):
             # Assign default algorithm
             mgf1 = self.mgf1
 
-        # Get our Algorithm hash value
-        _alg = self.__get_hash_func(alg)
-        _mgf1 = self.__get_hash_func(mgf1)
-
         try:
             return self.public_key.encrypt(
-                payload,
-                # OAEP (Optimal Asymmetric Encryption Padding) is a padding
-                # scheme defined in RFC 3447. It provides probabilistic
-                # encryption and is proven secure against several attack
-                # types. This is the recommended padding algorithm for RSA
-                # encryption.
-                padding.OAEP(
-                    mgf=padding.MGF1(algorithm=_mgf1()),
-                    algorithm=_alg(),
-                    label=None,
-                )
-            )
+                payload, self.__get_padding(alg, mgf1))
 
         except TypeError:
             # Decryption Failed
@@ -341,24 +354,21 @@ class NNTPCryptography(object):
         if mgf1 is None:
             mgf1 = self.mgf1
 
-        # Get our Algorithm hash value
-        _alg = self.__get_hash_func(alg)
-        _mgf1 = self.__get_hash_func(mgf1)
+        if len(payload) != self.private_key.key_size // 8:
+            # Encrypted content is always the size of the key it was
+            # encrypted with; there is no need to have the backend tell us
+            # it can't be decrypted
+            logger.error(
+                'Cryptography / decryption failed '
+                '(size=%d, alg=%s, mgf1=%s)' % (
+                    len(payload), alg, mgf1,
+                )
+            )
+            return None
 
         try:
             return self.private_key.decrypt(
-                payload,
-                # OAEP (Optimal Asymmetric Encryption Padding) is a padding
-                # scheme defined in RFC 3447. It provides probabilistic
-                # encryption and is proven secure against several attack
-                # types. This is the recommended padding algorithm for RSA
-                # encryption.
-                padding.OAEP(
-                    mgf=padding.MGF1(algorithm=_mgf1()),
-                    algorithm=_alg(),
-                    label=None
-                )
-            )
+                payload, self.__get_padding(alg, mgf1))
 
         except UnsupportedAlgorithm as e:
             # Decryption Failed
@@ -400,6 +410,78 @@ class NNTPCryptography(object):
         # We failed if we reach here
         return None
 
+    def encrypt_stream(self, payload, alg=None, mgf1=None):
+        """
+        A generator that encrypts a payload of any size by breaking it into
+        chunks (no larger then chunk_size()) and returning the encrypted
+        version of each of them.
+
+        The payload can be a string or a file-like object; the latter is read
+        a piece at a time so it never has to be entirely in memory.
+
+        If a chunk can't be encrypted then None is returned in it's place
+        and the generator stops.
+        """
+        if alg is None:
+            alg = self.alg
+
+        for chunk in self.__blocks(payload, self.chunk_size(alg)):
+            encrypted = self.encrypt(chunk, alg=alg, mgf1=mgf1)
+
+            yield encrypted
+            if encrypted is None:
+                return
+
+    def decrypt_stream(self, payload, alg=None, mgf1=None):
+        """
+        A generator that reverses encrypt_stream(); the payload is made up
+        of blocks encrypted by our keys which are each decrypted and returned.
+        Just like encrypt_stream(), the payload can be a file-like object.
+
+        If a block can't be decrypted then None is returned in it's place
+        and the generator stops.
+        """
+        if not self.private_key:
+            yield None
+            return
+
+        # Every encrypted block is the size of our key
+        block_size = self.private_key.key_size // 8
+        for block in self.__blocks(payload, block_size):
+            decrypted = self.decrypt(block, alg=alg, mgf1=mgf1)
+
+            yield decrypted
+            if decrypted is None:
+                return
+
+    def encrypt_many(self, payloads, alg=None, mgf1=None, max_workers=None):
+        """
+        Encrypts each of the payloads specified and returns a list of the
+        results (in the same order). Each entry is exactly what encrypt()
+        would have returned for it.
+
+        The payloads are encrypted in parallel by a pool of threads (one per
+        cpu if max_workers isn't specified); our keys can safely be shared
+        between them and the cryptography backend releases the GIL while it
+        works.
+        """
+        return self.__map(
+            lambda payload: self.encrypt(payload, alg=alg, mgf1=mgf1),
+            payloads, max_workers)
+
+    def decrypt_many(self, payloads, alg=None, mgf1=None, max_workers=None):
+        """
+        Decrypts each of the payloads specified and returns a list of the
+        results (in the same order). Each entry is exactly what decrypt()
+        would have returned for it.
+
+        The payloads are decrypted in parallel by a pool of threads (one per
+        cpu if max_workers isn't specified).
+        """
+        return self.__map(
+            lambda payload: self.decrypt(payload, alg=alg, mgf1=mgf1),
+            payloads, max_workers)
+
     def keys(self):
         """
         Simply return our Private and Public key in a tuple as such:
@@ -430,7 +512,7 @@ class NNTPCryptography(object):
 
         # Store our password; this will be used when we save our content
         # via it's searialized value later on
-        self.password = password
+        self.password = self.__password(password)
 
         # Returns a (RSAPrivateKey, RSAPublicKey)
         return (self.private_key, self.public_key)
@@ -448,19 +530,34 @@ class NNTPCryptography(object):
         if password is None:
             password = self.password
 
+        else:
+            password = self.__password(password)
+
+        if self._private_pem is None or \
+                self._private_pem[0] is not self.private_key:
+            self._private_pem = (self.private_key, {})
+
+        pems = self._private_pem[1]
+        if password in pems:
+            return pems[password]
+
         if password:
-            return self.private_key.private_bytes(
+            pem = self.private_key.private_bytes(
                encoding=serialization.Encoding.PEM,
                format=serialization.PrivateFormat.PKCS8,
                encryption_algorithm=serialization
                        .BestAvailableEncryption(password)
             )
 
-        return self.private_key.private_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PrivateFormat.TraditionalOpenSSL,
-            encryption_algorithm=serialization.NoEncryption(),
-        )
+        else:
+            pem = self.private_key.private_bytes(
+                encoding=serialization.Encoding.PEM,
+                format=serialization.PrivateFormat.TraditionalOpenSSL,
+                encryption_algorithm=serialization.NoEncryption(),
+            )
+
+        pems[password] = pem
+        return pem
 
     def public_pem(self):
         """
@@ -475,10 +572,43 @@ class NNTPCryptography(object):
                 return None
             self.public_key = self.private_key.public_key()
 
-        return self.public_key.public_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PublicFormat.SubjectPublicKeyInfo,
-        )
+        if self._public_pem is None or \
+                self._public_pem[0] is not self.public_key:
+            self._public_pem = (
+                self.public_key,
+                self.public_key.public_bytes(
+                    encoding=serialization.Encoding.PEM,
+                    format=serialization.PublicFormat.SubjectPublicKeyInfo,
+                ),
+            )
+
+        return self._public_pem[1]
+
+    def thumbprint(self):
+        """
+        Returns the SHA256 digest of our public key in it's DER
+        (SubjectPublicKeyInfo) form. It's a (32 byte) fingerprint that
+        uniquely identifies our key pair.
+
+        This function returns None if the public key could not be acquired.
+
+        """
+        if not isinstance(self.public_key, RSAPublicKey):
+            if not isinstance(self.private_key, RSAPrivateKey):
+                return None
+            self.public_key = self.private_key.public_key()
+
+        if self._thumbprint is None or \
+                self._thumbprint[0] is not self.public_key:
+            self._thumbprint = (
+                self.public_key,
+                sha256(self.public_key.public_bytes(
+                    encoding=serialization.Encoding.DER,
+                    format=serialization.PublicFormat.SubjectPublicKeyInfo,
+                )).digest(),
+            )
+
+        return self._thumbprint[1]
 
     def load(self, private_key, public_key=None, password=None,
              alg=None, mgf1=None):
@@ -493,6 +623,8 @@ class NNTPCryptography(object):
         self.alg = None
         self.mgf1 = None
 
+        password = self.__password(password)
+
         if isinstance(private_key, RSAPrivateKey):
             # Easy-Peasy
             self.private_key = private_key
@@ -692,12 +824,139 @@ class NNTPCryptography(object):
 
         return True
 
-    def chunk_size(self):
+    def chunk_size(self, alg=None):
+        """
+        Returns the maximum chunk size given the configuration (or the hash
+        algorithm specified).
+
+        The size is derived from our public key (if we have one) as OAEP
+        padding limits what can be encrypted to the key size less twice the
+        size of the hash (less 2 bytes). The max_chunk defined by our hash
+        map (which assumes a 2048 bit key) is used otherwise.
+
         """
-        Returns the maximum chunk size given the configuration.
+        if alg is None:
+            alg = self.alg
+
+        if alg not in CRYPTOGRAPHY_HASH_MAP:
+            alg = CRYPTOGRAPHY_DEFAULT_HASH
+
+        if self.public_key is None:
+            return CRYPTOGRAPHY_HASH_MAP[alg]['max_chunk']
+
+        return self.public_key.key_size // 8 - \
+            2 * CRYPTOGRAPHY_HASH_MAP[alg]['function'].digest_size - 2
 
+    def __gzip_encode(self, pem):
         """
-        return CRYPTOGRAPHY_HASH_MAP[self.alg]['max_chunk']
+        Returns the gzipped version of the pem specified with base64 applied
+        to it.
+
+        None is returned if no pem was specified.
+        """
+        if pem is None:
+            # It wasn't initialized yet
+            return None
+
+        compressor = compressobj(9, DEFLATED, GZIP_WBITS)
+        # b2a_base64() always terminates what it returns with a newline
+        return b2a_base64(compressor.compress(pem) + compressor.flush())[:-1]
+
+    def __gzip_decode(self, encoded):
+        """
+        Reverses __gzip_encode() returning the pem that was encoded.
+
+        None is returned if the content could not be decoded.
+        """
+        try:
+            return decompress(a2b_base64(encoded), GZIP_WBITS)
+
+        except (TypeError, BinasciiError, ZlibError):
+            return None
+
+    def __get_padding(self, alg, mgf1):
+        """
+        Returns the (cached) padding used to encrypt and decrypt content
+        with the hash and mask generation function specified.
+
+        """
+        _alg = self.__get_hash_func(alg)
+        _mgf1 = self.__get_hash_func(mgf1)
+
+        try:
+            return OAEP_PADDING_CACHE[(_alg, _mgf1)]
+
+        except KeyError:
+            # OAEP (Optimal Asymmetric Encryption Padding) is a padding
+            # scheme defined in RFC 3447. It provides probabilistic
+            # encryption and is proven secure against several attack
+            # types. This is the recommended padding algorithm for RSA
+            # encryption.
+            _padding = padding.OAEP(
+                mgf=padding.MGF1(algorithm=_mgf1()),
+                algorithm=_alg(),
+                label=None,
+            )
+
+        OAEP_PADDING_CACHE[(_alg, _mgf1)] = _padding
+        return _padding
+
+    def __blocks(self, payload, block_size):
+        """
+        A generator that returns the payload specified in blocks of
+        block_size bytes (the last one may be smaller).
+
+        File-like payloads are read SSL_WRITE_BLOCKSIZE bytes (rounded to a
+        whole number of blocks) at a time.
+
+        """
+        if not hasattr(payload, 'read'):
+            for offset in xrange(0, len(payload), block_size):
+                yield payload[offset:offset + block_size]
+            return
+
+        read_size = max(SSL_WRITE_BLOCKSIZE // block_size, 1) * block_size
+        while True:
+            data = payload.read(read_size)
+            if not data:
+                break
+
+            for offset in xrange(0, len(data), block_size):
+                yield data[offset:offset + block_size]
+
+    def __map(self, function, payloads, max_workers=None):
+        """
+        Returns a list of the results of calling function against each of
+        the payloads specified using a pool of threads.
+
+        """
+        payloads = list(payloads)
+
+        if not max_workers:
+            max_workers = cpu_count()
+
+        max_workers = min(max_workers, len(payloads))
+        if max_workers <= 1:
+            # Nothing to be gained by using our threads
+            return [function(payload) for payload in payloads]
+
+        pool = ThreadPool(max_workers)
+        try:
+            return pool.map(function, payloads)
+
+        finally:
+            pool.kill()
+
+    def __password(self, password):
+        """
+        Returns the password specified in the (byte) form our keys are
+        serialized with; None is returned if there is no password.
+
+        """
+        if isinstance(password, unicode):
+            password = password.encode('utf-8')
+
+        return password if password else None
 
     def __get_hash_func(self, htype):
         """
@@ -713,7 +972,25 @@ class NNTPCryptography(object):
         Handles equality
 
         """
-        return str(self) == str(self)
+        if isinstance(other, NNTPCryptography):
+            # Compare our thumbprints (oppose to our entire pem)
+            return self.thumbprint() == other.thumbprint()
+
+        return str(self) == str(other)
+
+    def __ne__(self, other):
+        """
+        Handles inequality
+
+        """
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        """
+        Allows our object to be used in sets and as a dictionary key
+
+        """
+        return hash(self.thumbprint())
 
     def __str__(self):
         """
@@ -19,6 +19,24 @@ from .Mime import Mime
 from .Mime import MimeResponse
 from .Utils import bytes_to_strsize
 
+# Empty content can only ever be identified by it's filename which doesn't
+# involve libmagic (or any state); so a single Mime object is shared
+MIME = Mime()
+
+# The segments of a posted file are usually all the same size; so we cache
+# the printable version of each size we come across (keyed by size) and share
+# it between all of our objects. The cache is reset if it grows too large.
+STRSIZE_CACHE = {}
+STRSIZE_CACHE_MAX = 1024
+
+
+def _disabled(self, *args, **kwargs):
+    """
+    Disable some commonly used functions when dealing with an EmptyContent
+    object.
+    """
+    return False
+
 
 class NNTPEmptyContent(NNTPContent):
     """
@@ -26,6 +44,11 @@ class NNTPEmptyContent(NNTPContent):
     helps with sorting and/or validation by holding information that may have
     been extract from an nzbfile or other source.
     """
+    # Empty content is created in bulk (an entry per segment of an nzbfile
+    # we haven't retrieved yet); we spare each instance the dictionary it
+    # would otherwise carry
+    __slots__ = ('_str', )
+
     def __init__(self, filepath=None, part=None, total_parts=None,
                  begin=None, end=None, total_size=None,
                  work_dir=None, *args, **kwargs):
@@ -38,6 +61,9 @@ class NNTPEmptyContent(NNTPContent):
             work_dir=work_dir,
             sort_no=5000, *args, **kwargs)
 
+        # Our printable name is cached as the tuple: (filename, part, string)
+        self._str = None
+
     def getvalue(self):
         """
         Return an empty string
@@ -50,54 +76,9 @@ class NNTPEmptyContent(NNTPContent):
         """
         return False
 
-    def encode(self, *args, **kwargs):
-        """
-        Disable some commonly used functions when dealing with an EmptyContent
-        object.
-        """
-        return False
-
-    def load(self, *args, **kwargs):
-        """
-        Disable some commonly used functions when dealing with an EmptyContent
-        object.
-        """
-        return False
-
-    def copy(self, *args, **kwargs):
-        """
-        Disable some commonly used functions when dealing with an EmptyContent
-        object.
-        """
-        return False
-
-    def save(self, *args, **kwargs):
-        """
-        Disable some commonly used functions when dealing with an EmptyContent
-        object.
-        """
-        return False
-
-    def split(self, *args, **kwargs):
-        """
-        Disable some commonly used functions when dealing with an EmptyContent
-        object.
-        """
-        return False
-
-    def write(self, *args, **kwargs):
-        """
-        Disable some commonly used functions when dealing with an EmptyContent
-        object.
-        """
-        return False
-
-    def read(self, *args, **kwargs):
-        """
-        Disable some commonly used functions when dealing with an EmptyContent
-        object.
-        """
-        return False
+    # Disable some commonly used functions when dealing with an EmptyContent
+    # object; they all share the one function.
+    encode = load = copy = save = split = write = read = append = _disabled
 
     def close(self, *args, **kwargs):
         """
@@ -106,13 +87,6 @@ class NNTPEmptyContent(NNTPContent):
         """
         return
 
-    def append(self, *args, **kwargs):
-        """
-        Disable some commonly used functions when dealing with an EmptyContent
-        object.
-        """
-        return False
-
     def next(self):
         """
         Python 2 support
@@ -121,18 +95,18 @@ class NNTPEmptyContent(NNTPContent):
         """
         raise StopIteration()
 
+    # Python 3 support
+    __next__ = next
+
     def mime(self):
         """
         Returns the mime of the object
             Source: https://github.com/ahupp/python-magic
         """
 
-        # Initialize our Mime object
-        m = Mime()
-
-        # Try to detect by our filename
-        mr = m.from_filename(
-            self.filename if self.filename else self.filepath)
+        # Try to detect by our filename; we never buffer any content so
+        # there is no need to go through our filepath property
+        mr = MIME.from_filename(self.filename or self._filepath)
 
         if mr is None:
             # Return our type
@@ -157,11 +131,17 @@ class NNTPEmptyContent(NNTPContent):
         """
         return None
 
+    def digests(self, *args, **kwargs):
+        """
+        No digests Associated with EmptyContent
+        """
+        return None
+
     def tell(self):
         """
-        always 0L
+        always 0
         """
-        return 0L
+        return 0
 
     def readline(self, *args, **kwargs):
         """
@@ -169,30 +149,41 @@ class NNTPEmptyContent(NNTPContent):
         """
         return ''
 
-    def __next__(self):
+    def __iter__(self):
         """
-        Python 3 support
-        Support stream type functions and iterations
-        Do nothing in an EmptyContent object
+        There is never anything to iterate over in an EmptyContent object
         """
-        raise StopIteration()
+        return iter(())
 
-    def __iter__(self):
+    def strsize(self):
         """
-        Grants usage of the next()
+        Returns our (total) size in a human readable string
         """
+        size = len(self)
+        if size not in STRSIZE_CACHE:
+            if len(STRSIZE_CACHE) >= STRSIZE_CACHE_MAX:
+                # Don't let our cache grow without bounds
+                STRSIZE_CACHE.clear()
+
+            STRSIZE_CACHE[size] = bytes_to_strsize(size)
 
-        # Ensure our stream is open with read
-        return self
+        return STRSIZE_CACHE[size]
 
     def __str__(self):
         """
         Return a printable version of the file being read
         """
-        if self.part is not None:
-            return '%s.%.5d' % (self.filename, self.part)
+        if self._str is None or self._str[0] != self.filename or \
+                self._str[1] != self.part:
+
+            self._str = (
+                self.filename,
+                self.part,
+                self.filename if self.part is None
+                else '%s.%.5d' % (self.filename, self.part),
+            )
 
-        return self.filename
+        return self._str[2]
 
     def __len__(self):
         """
@@ -212,11 +203,11 @@ class NNTPEmptyContent(NNTPContent):
                     self.filename,
                     self.part,
                     self.total_parts,
-                    bytes_to_strsize(len(self))
+                    self.strsize(),
                 )
         else:
             return '<NNTPEmptyContent sort=%d filename="%s" len=%s />' % (
                 self.sort_no,
                 self.filename,
-                bytes_to_strsize(len(self)),
+                self.strsize(),
             )
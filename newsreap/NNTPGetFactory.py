@@ -15,8 +15,12 @@
 # GNU Lesser General Public License for more details.
 
 import weakref
-from collections import deque
+import gevent
+from array import array
+from time import time
 from tqdm import tqdm
+from multiprocessing import cpu_count
+from gevent.threadpool import ThreadPool
 
 from os import getcwd
 import sys
@@ -49,6 +53,10 @@ import logging
 from newsreap.Logging import NEWSREAP_ENGINE
 logger = logging.getLogger(NEWSREAP_ENGINE)
 
+# The types we've found that can't be referenced by a weakref.proxy(); we track
+# them so we don't keep trying (and failing) each time we come across them
+NO_WEAKREF_TYPES = set()
+
 
 class NNTPGetFactory(object):
     """
@@ -66,14 +74,28 @@ class NNTPGetFactory(object):
     # Used for calculating queue sizes
     xfer_rate_max_queue_size = 20
 
+    # Socket reads are accumulated and only applied to our transfer rates (and
+    # totals) once we've received this many bytes or this many seconds have
+    # elapsed since we last did
+    xfer_flush_bytes = 65536
+    xfer_flush_interval = 0.1
+
+    # How often (in seconds) our progress bar is redrawn
+    xfer_refresh_interval = 0.25
+
     def __init__(self, connection=None, hooks=None, groups=None,
-                 *args, **kwargs):
+                 recv_bufsize=65536, *args, **kwargs):
         """
         Initializes an NNTPGetFactory object
 
         hooks are called if specific functions exist in the module defined by
         the hook. You can specfy as many hooks as you want.1
 
+        The recv_bufsize is the size (in bytes) of the receive buffer used by
+        each of our connections; a larger buffer allows for fewer reads on
+        fast links at the cost of memory per connection. Set it to None to
+        leave it up to the operating system.
+
         """
 
         # A boolean that allows us to enable/disable certain parts of our
@@ -108,6 +130,9 @@ class NNTPGetFactory(object):
         if not self.connection:
             self.connection = NNTPManager()
 
+        # Set the receive buffer size of our connection(s)
+        self.connection.set_recv_bufsize(recv_bufsize)
+
         # Setup our HookManager for managing hooks
         self.hooks = self.connection.hooks
 
@@ -129,8 +154,21 @@ class NNTPGetFactory(object):
         # subsiquent call to load.
         self.results = None
 
-        # Used for monitoring our transfer speeds
-        self.xfer_rate = deque()
+        # Used for monitoring our transfer speeds; it's a ring buffer of the
+        # last xfer_rate_max_queue_size speeds we've measured
+        self.xfer_rate = array('d', [0.0] * self.xfer_rate_max_queue_size)
+
+        # The index the next speed is written to, the number of speeds stored
+        # and their sum (so we never have to add them all up again)
+        self._xfer_rate_idx = 0
+        self._xfer_rate_count = 0
+        self._xfer_rate_sum = 0.0
+
+        # The bytes (and time spent receiving them) not yet accounted for in
+        # our transfer rates along with when we last accounted for them
+        self._xfer_pending_bytes = 0
+        self._xfer_pending_time = 0.0
+        self._xfer_last_flush = time()
 
         # Average transfer rate
         self.xfer_rate_avg = 0
@@ -141,6 +179,13 @@ class NNTPGetFactory(object):
         # Our tqdm status bar reference
         self.xfer_tqdm = None
 
+        # The greenlet that redraws our progress bar
+        self._xfer_refresh = None
+
+        # The pool of threads our segments are joined by; it's created the
+        # first time we need it (see _pool()) and re-used from then on
+        self._threadpool = None
+
         # Reset our transfer health back to 100%
         self.xfer_health = 100
 
@@ -151,6 +196,27 @@ class NNTPGetFactory(object):
         self.hooks.add(self.transfer_count)
         self.hooks.add(self.transfer_rates)
 
+    @staticmethod
+    def _weak(obj):
+        """
+        Returns a weak reference (proxy) to the object specified; the object
+        itself is returned if it can't be referenced this way (or if it's
+        already a weak reference).
+
+        """
+        if type(obj) in NO_WEAKREF_TYPES:
+            return obj
+
+        try:
+            return weakref.proxy(obj)
+
+        except TypeError:
+            # Some types just can't be converted into a weak reference
+            # Either that, or we're already in a weakref format
+            # no problem...
+            NO_WEAKREF_TYPES.add(type(obj))
+            return obj
+
     @hook(name='socket_read')
     def transfer_rates(self, xfer_bytes, xfer_time, **kwargs):
         """
@@ -158,20 +224,92 @@ class NNTPGetFactory(object):
 
         """
 
-        self.xfer_rate.append(xfer_bytes / xfer_time)
-        if len(self.xfer_rate) > self.xfer_rate_max_queue_size:
-            # bump oldest off of our list
-            self.xfer_rate.popleft()
+        self._xfer_pending_bytes += xfer_bytes
+        if xfer_time > 0.0:
+            # Our reads are timed off of the wall clock which can be adjusted
+            # from underneath us; ignore any time that ran backwards
+            self._xfer_pending_time += xfer_time
+
+        if self._xfer_pending_bytes < self.xfer_flush_bytes and \
+                time() - self._xfer_last_flush < self.xfer_flush_interval:
+            # We'll account for this later
+            return
+
+        self._flush_transfer_rates()
+
+    def _flush_transfer_rates(self):
+        """
+        Applies the socket reads accumulated by transfer_rates() to our
+        transfer speeds and progress bar.
+
+        """
+        xfer_bytes = self._xfer_pending_bytes
+        xfer_time = self._xfer_pending_time
+
+        self._xfer_pending_bytes = 0
+        self._xfer_pending_time = 0.0
+        self._xfer_last_flush = time()
+
+        if not xfer_bytes:
+            # Nothing to account for
+            return
+
+        # Track the total bytes received; our progress bar is redrawn from
+        # this on it's own schedule (see _refresh_progress()). We do this
+        # even if the reads were too fast to time so no bytes go unreported.
+        self.xfer_rx_total += xfer_bytes
+
+        if xfer_time <= 0.0:
+            # The clock used to time these reads didn't advance (or went
+            # backwards); there is no speed we can derive from them
+            return
+
+        # Replace the oldest speed in our ring buffer with this one
+        rate = xfer_bytes / xfer_time
+        self._xfer_rate_sum += rate - self.xfer_rate[self._xfer_rate_idx]
+        self.xfer_rate[self._xfer_rate_idx] = rate
+        self._xfer_rate_idx = \
+            (self._xfer_rate_idx + 1) % self.xfer_rate_max_queue_size
+
+        if self._xfer_rate_count < self.xfer_rate_max_queue_size:
+            self._xfer_rate_count += 1
 
         # Calculate our average speed
-        self.xfer_rate_avg = sum(self.xfer_rate) / float(len(self.xfer_rate))
+        self.xfer_rate_avg = self._xfer_rate_sum / self._xfer_rate_count
 
-        if self.xfer_tqdm is not None:
-            # Track the total bytes received
-            self.xfer_rx_total += xfer_bytes
+    def _refresh_progress(self):
+        """
+        Redraws our progress bar (every xfer_refresh_interval seconds) to
+        reflect the total bytes we've received. This runs in it's own
+        greenlet so that the rate we receive content at has no bearing on
+        how often we redraw.
 
-            # Update our progress bar
-            self.xfer_tqdm.update(xfer_bytes)
+        """
+        while self.xfer_tqdm is not None:
+            gevent.sleep(self.xfer_refresh_interval)
+            self._update_progress()
+
+    def _update_progress(self):
+        """
+        Updates our progress bar (if we have one) with the total bytes we've
+        received.
+
+        """
+        if self.xfer_tqdm is not None and \
+                self.xfer_tqdm.n != self.xfer_rx_total:
+            self.xfer_tqdm.n = self.xfer_rx_total
+            self.xfer_tqdm.refresh()
+
+    def _stop_progress(self):
+        """
+        Stops redrawing our progress bar (after bringing it up to date).
+
+        """
+        if self._xfer_refresh is not None:
+            self._xfer_refresh.kill()
+            self._xfer_refresh = None
+
+        self._update_progress()
 
     @hook(name='post_get')
     def transfer_count(self, status, **kwargs):
@@ -212,9 +350,16 @@ class NNTPGetFactory(object):
         self.results = None
 
         # Reset our transfer rate queue
-        self.xfer_rate.clear()
+        self.xfer_rate = array('d', [0.0] * self.xfer_rate_max_queue_size)
+        self._xfer_rate_idx = 0
+        self._xfer_rate_count = 0
+        self._xfer_rate_sum = 0.0
+        self._xfer_pending_bytes = 0
+        self._xfer_pending_time = 0.0
+        self._xfer_last_flush = time()
 
         # Destory our tqdm object (if present)
+        self._stop_progress()
         self.xfer_tqdm = None
 
         # Reset our transfer average rate
@@ -228,7 +373,8 @@ class NNTPGetFactory(object):
         # to help
         self.xfer_health = 100
 
-        # Start by defining our base path
+        # Start by defining our base path; if one isn't specified then we use
+        # a directory that already exists (so there is nothing to create)
         self.base_path = path
 
         if groups is not None:
@@ -246,41 +392,47 @@ class NNTPGetFactory(object):
 
         if self.base_path:
             # Tidy it up
-            self.base_path = abspath(expanduser(abspath))
+            self.base_path = abspath(expanduser(self.base_path))
+
+            if not mkdir(self.base_path):
+                logger.error(
+                    "Could not create '{}'; aborting.".format(self.base_path))
+                return False
+
+        # Our source is either an NZB-File or a Message-ID
+        is_nzb = isfile(source)
+
+        if is_nzb:
+            # The filename of our NZB-File (without it's path)
+            filename = basename(source)
 
-        if isfile(source):
             if not self.base_path:
+                # The directory our NZB-File resides in
                 self.base_path = dirname(abspath(expanduser(source)))
 
             # We're dealing wth an NZB-File
-            self.name = splitext(basename(source))[0]
+            self.name = splitext(filename)[0]
 
             # Our final Download directory
             self.path = join(self.base_path, self.name)
 
         else:
             # Check if we're a Message-ID
-            try:
-                msgid = MESSAGE_ID_RE.match(source).group('id')
-
-            except AttributeError:
+            match = MESSAGE_ID_RE.match(source)
+            if match is None:
                 logger.error("'{}' is not NNTP retrievable.".format(source))
                 return False
 
+            # We're dealing with a Message-ID
+            self.name = match.group('id')
+
             if not self.base_path:
+                # Our current working directory
                 self.base_path = getcwd()
 
-            # We're dealing with a Message-ID
-            self.name = msgid
-
             # Our final download directory
             self.path = self.base_path
 
-        if not mkdir(self.base_path):
-            logger.error(
-                "Could not create '{}'; aborting.".format(self.base_path))
-            return False
-
         # A temporary directory we will work with until we're done
         self.tmp_path = join(self.base_path, '{}.tmp'.format(self.name))
 
@@ -289,9 +441,9 @@ class NNTPGetFactory(object):
         self.engine = 'sqlite:///%s' % self.db_path
         self._db = None
 
-        logger.debug("Scanning NZB-File '%s'." % (basename(source)))
+        if is_nzb:
+            logger.debug("Scanning NZB-File '%s'." % (filename))
 
-        if isfile(source):
             # Load our NZB-File using all of the variables we've initialized
             # above.
             self.nzb = NNTPnzb(
@@ -303,11 +455,16 @@ class NNTPGetFactory(object):
             if not self.nzb.is_valid():
                 # Check that the file is valid
                 logger.error(
-                    "Invalid NZB-File '{}'.".format(basename(source)))
+                    "Invalid NZB-File '{}'.".format(filename))
                 return False
 
             # Load our size into our progress bar object
-            self.xfer_tqdm = tqdm(total=self.nzb.size(), unit_scale=True)
+            self.xfer_tqdm = tqdm(
+                total=self.nzb.size(), unit_scale=True,
+                mininterval=self.xfer_refresh_interval)
+
+            # Redraw it as we go
+            self._xfer_refresh = gevent.spawn(self._refresh_progress)
 
         # It's safe to toggle our flag now
         self._loaded = True
@@ -354,14 +511,11 @@ class NNTPGetFactory(object):
                 status = None
 
         finally:
-            try:
-                weak_results = weakref.proxy(self.results)
+            # Account for any transfers we haven't yet
+            self._flush_transfer_rates()
+            self._stop_progress()
 
-            except TypeError:
-                # Some types just can't be converted into a weak reference
-                # Either that, or we're already in a weakref format
-                # no problem...
-                weak_results = self.results
+            weak_results = self._weak(self.results)
 
             self.hooks.call(
                 'post_download',
@@ -447,67 +601,108 @@ class NNTPGetFactory(object):
         # Initialize our status flag
         status = True
 
-        for segment in self.nzb:
-            # Now for each segment entry in our nzb file, we need to
-            # combine it as one; but we need to get our filename's
-            # straight. We will try to build the best name we can from
-            # each entry we find.
+        # Segments are joined by a pool of threads while we save the ones
+        # already assembled; this way we're never just waiting on the disk
+        # (or the cpu). We never get more then a few segments ahead of
+        # ourselves so that we don't hold onto too many at once.
+        pool = self._pool()
 
-            # Track our segment count
-            seg_count = len(segment)
+        try:
+            for segment, joined in pool.imap(
+                    self._join, self.nzb, maxsize=2 * pool.maxsize):
+
+                # Now for each segment entry in our nzb file, we need to
+                # combine it as one; but we need to get our filename's
+                # straight. We will try to build the best name we can from
+                # each entry we find.
+
+                # Track our segment count
+                seg_count = len(segment)
+
+                if not joined:
+                    # We failed to join
+                    if segment.filename:
+                        # Toggle our return status
+                        status = False
+
+                        logger.warning(
+                            "Failed to assemble segment '%s' (%s)." % (
+                                segment.filename,
+                                segment.strsize(),
+                            ),
+                        )
+                        continue
 
-            if not segment.join():
-                # We failed to join
-                if segment.filename:
-                    # Toggle our return status
-                    status = False
+                    else:
+                        # Toggle our return status
+                        status = False
 
-                    logger.warning(
-                        "Failed to assemble segment '%s' (%s)." % (
+                        logger.warning(
+                            "Failed to assemble segment (%s)." % (
+                                segment.strsize(),
+                            ),
+                        )
+                else:
+                    # We successfully joined our segment
+                    logger.debug("Assembled '%s' len=%s (parts=%d)." % (
+                        segment.filename, segment.strsize(), seg_count))
+
+                if segment.save(filepath=self.path):
+                    logger.info(
+                        "Successfully saved %s (%s)" % (
                             segment.filename,
                             segment.strsize(),
                         ),
                     )
-                    continue
-
                 else:
                     # Toggle our return status
                     status = False
 
-                    logger.warning(
-                        "Failed to assemble segment (%s)." % (
+                    logger.error(
+                        "Failed to save %s (%s)" % (
+                            segment.filename,
                             segment.strsize(),
                         ),
                     )
-            else:
-                # Toggle our return status
-                status = False
-
-                # We failed to join
-                logger.debug("Assembled '%s' len=%s (parts=%d)." % (
-                    segment.filename, segment.strsize(), seg_count))
-
-            if segment.save(filepath=self.path):
-                logger.info(
-                    "Successfully saved %s (%s)" % (
-                        segment.filename,
-                        segment.strsize(),
-                    ),
-                )
-            else:
-                # Toggle our return status
-                status = False
 
-                logger.error(
-                    "Failed to save %s (%s)" % (
-                        segment.filename,
-                        segment.strsize(),
-                    ),
-                )
+        except:
+            # Don't leave any work we've abandoned behind for the next
+            # one to use our pool
+            self._close_pool()
+            raise
 
         # Return our status
         return status
 
+    def _pool(self):
+        """
+        Returns the pool of threads owned by this factory; it's created on
+        the first call (sized by the number of cpus we have) and re-used by
+        every call thereafter until _close_pool() is called.
+
+        """
+        if self._threadpool is None:
+            self._threadpool = ThreadPool(cpu_count())
+
+        return self._threadpool
+
+    def _close_pool(self):
+        """
+        Stops (and releases) the threads owned by this factory (if any)
+
+        """
+        if self._threadpool is not None:
+            self._threadpool.kill()
+            self._threadpool = None
+
+    def _join(self, segment):
+        """
+        Joins the segment specified and returns the tuple (segment, joined)
+        where joined is the result of the join.
+
+        """
+        return (segment, segment.join())
+
     def headers(self, source=None, *args, **kwargs):
         """
         A Wrapper to _headers() as this allows us to call our header_hooks
@@ -532,13 +727,7 @@ class NNTPGetFactory(object):
             # Store our source
             source = self.name if self.nzb is None else self.nzb
 
-        try:
-            weak_source = weakref.proxy(source)
-
-        except TypeError:
-            # Some types just can't be converted into a weak reference
-            # no problem...
-            weak_source = source
+        weak_source = self._weak(source)
 
         try:
             status = self.hooks.call(
@@ -557,15 +746,7 @@ class NNTPGetFactory(object):
                 response = None
 
         finally:
-
-            try:
-                # self.results is populated from wthin  _headers()
-                weak_result = weakref.proxy(self.results)
-
-            except TypeError:
-                # Some types just can't be converted into a weak reference
-                # no problem...
-                weak_result = self.results
+            weak_result = self._weak(self.results)
 
             self.hooks.call(
                 'post_headers',
@@ -606,120 +787,51 @@ class NNTPGetFactory(object):
             return False
 
         elif isinstance(source, NNTPnzb):
-            # If we get here, we're dealing with an nzb file; iterate over our
-            # segments
-            for s_idx in range(len(source)):
-
-                # Now iterate over each article within our segment
-                for a_idx in range(len(source[s_idx])):
-
-                    # Acquire our Message-ID
-                    msgid = source[s_idx][a_idx].msgid()
-
-                    # Acquire our Group(s)
-                    group = source[s_idx][a_idx].groups
-
-                    # We can do our query in a non-blocking way if we're using
-                    # an NNTPManager object
-                    if isinstance(self.connection, NNTPManager):
-                        # Get our article header
-                        header_list.append((
-                            source[s_idx][a_idx],
-                            self.connection.stat(
-                                msgid,
-                                full=True,
-                                group=group,
-                                block=False,
-                            ),
-                        ))
-
-                    elif isinstance(self.connection, NNTPConnection):
-                        # Otherwise we need to block
-                        headers = self.connection.stat(
-                            msgid,
-                            full=True,
-                            group=group,
-                        )
-
-                        if headers:
-                            # Store our returned header into our article
-                            source[s_idx][a_idx].header = headers
-
-                        else:
-                            # Ensure our header is empty
-                            source[s_idx][a_idx].header.clear()
-                            response = False
+            # If we get here, we're dealing with an nzb file; we want every
+            # article within each of it's segments
+            articles = (article for segment in source for article in segment)
 
         elif isinstance(source, NNTPSegmentedPost):
-
             # iterate over each article within our segment
-            for a_idx in range(len(source)):
-
-                # Acquire our Message-ID
-                msgid = source[a_idx].msgid()
-
-                # Acquire our Group(s)
-                group = source[s_idx][a_idx].groups
-
-                # We can do our query in a non-blocking way if we're using
-                # an NNTPManager object
-                if isinstance(self.connection, NNTPManager):
-                    # Get our article header
-                    header_list.append((
-                        source[a_idx],
-                        self.connection.stat(
-                            msgid,
-                            full=True,
-                            group=group,
-                            block=False,
-                        ),
-                    ))
-
-                elif isinstance(self.connection, NNTPConnection):
-                    # Otherwise we need to block
-                    headers = self.connection.stat(
-                        msgid,
-                        full=True,
-                        group=group,
-                    )
-
-                    if headers:
-                        # Store our returned header into our article
-                        source[a_idx].header = headers
-
-                    else:
-                        # Ensure our header is empty
-                        source[a_idx].header.clear()
-                        response = False
+            articles = iter(source)
 
         elif isinstance(source, NNTPArticle):
-
             # Fetch our article
-            if isinstance(self.connection, NNTPManager):
-                # Get our article header in a non-blocking mode
-                header_list.append((source, self.connection.stat(
-                    source.msgid(),
+            articles = (source, )
+
+        else:
+            # Nothing to fetch
+            articles = ()
+
+        if isinstance(self.connection, NNTPManager):
+            # We can do our query in a non-blocking way if we're using an
+            # NNTPManager object; queue every article before we wait on any
+            # of them
+            for article in articles:
+                header_list.append((article, self.connection.stat(
+                    article.msgid(),
                     full=True,
-                    group=source.groups,
+                    group=article.groups,
                     block=False,
                 )))
 
-            elif isinstance(self.connection, NNTPConnection):
-                # NNTPConnection objects are sequential; fetch our
-                # article in a blocking state
+        elif isinstance(self.connection, NNTPConnection):
+            # NNTPConnection objects are sequential; fetch our articles in a
+            # blocking state
+            for article in articles:
                 headers = self.connection.stat(
-                    source.msgid(),
+                    article.msgid(),
                     full=True,
-                    group=source.groups,
+                    group=article.groups,
                 )
 
                 if headers:
                     # Store our returned header into our article
-                    source.header = headers
+                    article.header = headers
 
                 else:
                     # Ensure our header is empty
-                    source.header.clear()
+                    article.header.clear()
                     response = False
 
         # At this point we should have a bunch of articles fetching
@@ -741,13 +853,7 @@ class NNTPGetFactory(object):
                 article.header = _connection.response[0]
 
         # Set our results object so we can reference if need be
-        try:
-            self.results = weakref.proxy(source)
-
-        except TypeError:
-            # Some types just can't be converted into a weak reference
-            # no problem...
-            self.results = source
+        self.results = self._weak(source)
 
         return response
 
@@ -772,13 +878,7 @@ class NNTPGetFactory(object):
             # Store our source
             source = self.name if self.nzb is None else self.nzb
 
-        try:
-            weak_source = weakref.proxy(source)
-
-        except TypeError:
-            # Some types just can't be converted into a weak reference
-            # no problem...
-            weak_source = source
+        weak_source = self._weak(source)
 
         try:
             response = self.hooks.call(
@@ -799,15 +899,7 @@ class NNTPGetFactory(object):
                 response = None
 
         finally:
-
-            try:
-                # self.results is populated from wthin  _inspect()
-                weak_result = weakref.proxy(self.results)
-
-            except TypeError:
-                # Some types just can't be converted into a weak reference
-                # no problem...
-                weak_result = self.results
+            weak_result = self._weak(self.results)
 
             self.hooks.call(
                 'post_inspect',
@@ -887,6 +979,9 @@ class NNTPGetFactory(object):
                 status = None
 
         finally:
+            # We're done with our threads
+            self._close_pool()
+
             self.hooks.call(
                 'post_clean',
                 name=self.name,
@@ -922,29 +1017,30 @@ class NNTPGetFactory(object):
 
         """
 
-        # Create a stream object we can write to
-        hdr_stream = StringIO()
+        # The pieces of our response; they're joined together once we've
+        # collected all of them
+        parts = []
 
         def prep_header(article):
             # NNTP Header object
             if headers:
-                hdr_stream.write('****\n' + article.header.str() + '\n')
+                parts.extend(('****\n', article.header.str(), '\n'))
 
             if inspect:
                 if article.body:
                     # Display the message body
-                    hdr_stream.write(
-                        '****\n' +
-                        article.body.getvalue().strip() +
+                    parts.extend((
+                        '****\n',
+                        article.body.getvalue().strip(),
                         '\n',
-                    )
+                    ))
 
                 # Display the head of the decoded message
-                hdr_stream.write('****\n')
-                hdr_stream.write('Mime-Type: %s\n' % (
-                    article.decoded[0].mime().type(),
+                parts.extend((
+                    '****\n',
+                    'Mime-Type: %s\n' % (article.decoded[0].mime().type()),
+                    article.decoded[0].hexdump(),
                 ))
-                hdr_stream.write(article.decoded[0].hexdump())
 
         if self.results is None:
             # Nothing to do
@@ -958,8 +1054,7 @@ class NNTPGetFactory(object):
             if isinstance(entry, NNTPHeader):
                 # NNTP Header object
                 if headers:
-                    hdr_stream.write(
-                        '****\n' + entry.str() + '\n')
+                    parts.extend(('****\n', entry.str(), '\n'))
 
             elif isinstance(entry, NNTPnzb):
                 for segment in entry:
@@ -973,12 +1068,8 @@ class NNTPGetFactory(object):
             elif isinstance(entry, NNTPArticle):
                 prep_header(entry)
 
-        # Return our stream object(s)
-        response = str()
-        if self.headers:
-            response += hdr_stream.getvalue()
-
-        return response
+        # Return our response
+        return ''.join(parts)
 
     def session(self, reset=False):
         """
@@ -15,6 +15,9 @@
 # GNU Lesser General Public License for more details.
 
 import re
+from weakref import WeakValueDictionary
+from string import ascii_letters
+from string import digits
 from os.path import dirname
 from os.path import abspath
 from os.path import join
@@ -23,6 +26,31 @@ from os.path import join
 # identfied; we split on anything that isn't a valid group token
 GROUP_INVALID_CHAR_RE = re.compile(r'[^A-Z0-9.-]+', re.I)
 
+# The same characters as the expression above but as a table we can pass
+# to str.translate() when normalizing a group (it's considerably faster)
+GROUP_INVALID_CHARS = ''.join(
+    c for c in map(chr, range(256)) if c not in ascii_letters + digits + '.-')
+
+# The file our shorthand translations are loaded from (and the expression
+# used to parse each line of it)
+GROUP_DAT_PATH = join(dirname(abspath(__file__)), 'var', 'groups.dat')
+GROUP_DAT_LINE_RE = re.compile(
+    r'^(?P<index>\d)\s+'
+    r'(?P<key>[a-z0-9.-]+)\s+'
+    r'(?P<lookup>[a-z0-9.-]+)', re.I)
+
+# The same group names are normalized over and over again (each time they're
+# compared against or split from a list of groups); so we cache the results
+# keyed by (group, shorthand, is_str). The cache is reset if it grows too
+# large.
+NORMALIZE_CACHE = {}
+NORMALIZE_CACHE_MAX = 4096
+
+# The same group tends to be referenced over and over again (once for every
+# article posted to it); we share a single (immutable) object per group name
+# for as long as something still references it. Keyed by (class, name).
+GROUP_INSTANCES = WeakValueDictionary()
+
 
 class NNTPGroup(object):
     """
@@ -36,18 +64,47 @@ class NNTPGroup(object):
     # used for translation lookups
     _translations = None
 
-    def __init__(self, name, *args, **kwargs):
+    def __new__(cls, name, *args, **kwargs):
         """
-        Initialize NNTP Group
+        Returns the NNTPGroup object for the group specified; an existing
+        one is returned if we have one for the same (normalized) name.
 
         """
-        # The Group Name
-        self.name = NNTPGroup.normalize(name)
-
-        if self.name is None:
+        normalized = NNTPGroup.normalize(name)
+        if normalized is None:
             raise AttributeError(
                 "Invalid group {} set specified.".format(name))
 
+        try:
+            return GROUP_INSTANCES[(cls, normalized)]
+
+        except KeyError:
+            pass
+
+        group = super(NNTPGroup, cls).__new__(cls)
+
+        # The Group Name
+        group.name = normalized
+
+        GROUP_INSTANCES[(cls, normalized)] = group
+        return group
+
+    def __init__(self, name, *args, **kwargs):
+        """
+        Initialize NNTP Group; there is nothing to do here as our object was
+        already prepared by __new__()
+
+        """
+        pass
+
+    def __reduce__(self):
+        """
+        Allows our object to be copied (and pickled); the copy is built from
+        our name and therefore is the same object we're sharing.
+
+        """
+        return (self.__class__, (self.name, ))
+
     @staticmethod
     def normalize(group, shorthand=True):
         """
@@ -65,8 +122,39 @@ class NNTPGroup(object):
             # Support passing in ourselves
             return group.name
 
+        if not isinstance(group, basestring):
+            # Nothing we can cache
+            return NNTPGroup._normalize(group, shorthand=shorthand)
+
+        # A str and unicode object can share the same key; but we want to
+        # return the same type we always have
+        key = (group, shorthand, isinstance(group, str))
         try:
-            group = GROUP_INVALID_CHAR_RE.sub('', group).lower()
+            return NORMALIZE_CACHE[key]
+
+        except KeyError:
+            pass
+
+        if len(NORMALIZE_CACHE) >= NORMALIZE_CACHE_MAX:
+            # Don't let our cache grow without bounds
+            NORMALIZE_CACHE.clear()
+
+        NORMALIZE_CACHE[key] = NNTPGroup._normalize(group, shorthand=shorthand)
+        return NORMALIZE_CACHE[key]
+
+    @staticmethod
+    def _normalize(group, shorthand=True):
+        """
+        Performs the actual normalization of the group specified; see
+        normalize() for details.
+
+        """
+        try:
+            if isinstance(group, str):
+                group = group.translate(None, GROUP_INVALID_CHARS).lower()
+
+            else:
+                group = GROUP_INVALID_CHAR_RE.sub('', group).lower()
 
         except (AttributeError, TypeError):
             # Invalid content passed in
@@ -80,40 +168,20 @@ class NNTPGroup(object):
 
         # If we reach here, we want to additionally try to look up any
         # shorthand notation and expand it
-        entries = re.split('[.]+', group)
-
-        if NNTPGroup._translations is None:
-            # Populate it
-            line_re = re.compile(
-                r'^(?P<index>\d)\s+'
-                r'(?P<key>[a-z0-9.-]+)\s+'
-                r'(?P<lookup>[a-z0-9.-]+)', re.I)
-
-            NNTPGroup._translations = list()
-            path = join(dirname(abspath(__file__)), 'var', 'groups.dat')
-            with open(path) as fd:
-                for line in fd:
-                    result = line_re.match(line)
-                    if not result:
-                        continue
-
-                    index = int(result.group('index'))
+        while '..' in group:
+            # Treat consecutive periods as one
+            group = group.replace('..', '.')
 
-                    while len(NNTPGroup._translations) < index+1:
-                        NNTPGroup._translations.append({})
+        entries = group.split('.')
 
-                    # store our lookup
-                    NNTPGroup._translations[index][result.group('key')] = \
-                        result.group('lookup')
+        translations = NNTPGroup._translations
+        if translations is None:
+            translations = NNTPGroup._load_translations()
 
         # Iterate over our names
-        for depth in range(len(NNTPGroup._translations)):
-            if depth >= len(entries):
-                # we're done
-                break
-
+        for depth, entry in enumerate(entries):
             # Perform our lookup and translate if we can
-            match = NNTPGroup._translations[depth].get(entries[depth])
+            match = translations.get((depth, entry))
             if not match:
                 # We can't skip some entries and translate others, the chain
                 # is broken on our first-mismatch
@@ -125,6 +193,30 @@ class NNTPGroup(object):
         # Return our compiled list
         return '.'.join(entries)
 
+    @staticmethod
+    def _load_translations():
+        """
+        Loads (and returns) our shorthand translations from GROUP_DAT_PATH;
+        this is only done once; the results are stored in _translations.
+
+        """
+        # Our translations are keyed by (depth, token); we build them on
+        # their own and only store them once they're complete so nothing
+        # ever sees them partially loaded
+        translations = dict()
+        with open(GROUP_DAT_PATH) as fd:
+            for line in fd:
+                result = GROUP_DAT_LINE_RE.match(line)
+                if not result:
+                    continue
+
+                # store our lookup
+                translations[(int(result.group('index')),
+                              result.group('key'))] = result.group('lookup')
+
+        NNTPGroup._translations = translations
+        return translations
+
     @staticmethod
     def split(groups):
         """
@@ -138,8 +230,14 @@ class NNTPGroup(object):
         if isinstance(groups, basestring):
             groups = GROUP_INVALID_CHAR_RE.split(groups)
 
-        if isinstance(groups, (set, list, tuple)):
-            for group in groups:
+        if not isinstance(groups, (set, list, tuple)):
+            return result
+
+        # The groups (and lists of groups) we have yet to process; we work
+        # our way through any nested lists using this instead of recursion
+        stack = [groups]
+        while stack:
+            for group in stack.pop():
                 if isinstance(group, NNTPGroup):
                     result.add(group)
 
@@ -151,8 +249,7 @@ class NNTPGroup(object):
                         pass
 
                 elif isinstance(group, (set, list, tuple)):
-                    # a little bit of recursion
-                    result |= NNTPGroup.split(group)
+                    stack.append(group)
 
         return result
 
@@ -189,13 +286,23 @@ class NNTPGroup(object):
 
         """
         if isinstance(other, NNTPGroup):
-            return self.name == other.name
+            return self is other or self.name == other.name
 
         elif isinstance(other, basestring):
-            return self.name == NNTPGroup.normalize(other)
+            # We're most often compared against a group that is already
+            # normalized; there is no need to normalize it again
+            return self.name == other or \
+                self.name == NNTPGroup.normalize(other)
 
         return False
 
+    def __ne__(self, other):
+        """
+        Handles inequality
+
+        """
+        return not self.__eq__(other)
+
     def __hash__(self):
         """
         allows us to make use of the 'in' keyword. Hence this object can
@@ -14,9 +14,6 @@
 # MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
 # GNU Lesser General Public License for more details.
 
-import gevent.monkey
-gevent.monkey.patch_all()
-
 # Importing these libraries forces them associate themselves
 # with the ObjectBase
 from .objects.group.Article import Article
@@ -36,10 +36,18 @@ HEADER_PRINT_SEQUENCE = (
     'X-Newsposter',
 )
 
+# The same entries as above; used to quickly identify the entries that
+# aren't in our sequence (and are therefore printed at the end)
+HEADER_PRINT_SET = frozenset(HEADER_PRINT_SEQUENCE)
+
+# How each header entry is formatted when posting
+HEADER_POST_FMT = '%s: %s' + NNTP_EOL
+
 # By maintaining a list of headers we can set manually that are defined by the
 # NNTP Spec, we can automatically stick X- infront of anything else so that
-# they are valid as well.
-VALID_HEADER_ENTRIES = (
+# they are valid as well. It's only ever used to look entries up, so a set
+# keeps that quick.
+VALID_HEADER_ENTRIES = frozenset((
     'Subject',
     'From',
     'Date',
@@ -50,7 +58,7 @@ VALID_HEADER_ENTRIES = (
     'Content-Type',
     'Mime-Version',
     'Content-Transfer-Encoding',
-)
+))
 
 # What we stick infront of any entry that is not marked in the Valid Header
 # list above
@@ -62,6 +70,97 @@ NNTP_NUKED_MSG = re.compile(
     re.IGNORECASE,
 )
 
+# Used to format our header keys (see _fmt_key()); the first
+# letter of each word is capitalized
+HEADER_KEY_WORD_RE = re.compile(r'(^|\s|[_-])(\S)')
+
+# Flip -id to ID (short for Identifier)
+# Flip -crc to CRC (short for Cyclic Redundancy Check)
+HEADER_KEY_ABBREV_RE = re.compile(
+    r'([_-])((id|crc)([^a-z0-9]|$))',
+    re.IGNORECASE,
+)
+
+
+def _upper_key(match):
+    """
+    Upper-cases the second group of a match made by one of our header key
+    expressions above (leaving the first group as is)
+    """
+    return match.group(1) + match.group(2).upper()
+
+
+# Most header keys are just words separated by a hyphen (Message-ID,
+# Content-Type, etc); these are formatted without the expressions above
+HEADER_KEY_SIMPLE_RE = re.compile(r'[a-z0-9]+(-[a-z0-9]+)*$')
+
+# The words we upper-case entirely when they follow a hyphen
+HEADER_KEY_ABBREVS = {
+    'id': 'ID',
+    'crc': 'CRC',
+}
+
+
+# Header keys are drawn from a small set (Subject, From, Message-ID, etc) and
+# are formatted each time they're looked up; so we cache what we've formatted
+# keyed by (key, is_str) so that a str key never returns what was formatted
+# for it's unicode equivalent (or vice versa). The cache is reset if it grows
+# too large.
+HEADER_KEY_CACHE = {}
+HEADER_KEY_CACHE_MAX = 512
+
+
+def _fmt_key(key):
+    """Formats the hash key for more consistent hits; hence fetching the
+    'Message-ID' key should still be fetched even if the user indexes
+    with 'message-id'.
+    """
+    if not isinstance(key, basestring):
+        # Handle invalid key entries types
+        key = str(key)
+
+    cache_key = (key, isinstance(key, str))
+    try:
+        return HEADER_KEY_CACHE[cache_key]
+
+    except KeyError:
+        pass
+
+    fmt_key = key.strip().lower()
+    if HEADER_KEY_SIMPLE_RE.match(fmt_key) is not None:
+        # Capitalize each word; our expressions never upper-case two
+        # abbreviations in a row (the hyphen between them is consumed by
+        # the first match), so neither do we
+        words = []
+        abbrev = False
+        for word in fmt_key.split('-'):
+            if words and not abbrev and word in HEADER_KEY_ABBREVS:
+                words.append(HEADER_KEY_ABBREVS[word])
+                abbrev = True
+
+            else:
+                words.append(word.capitalize())
+                abbrev = False
+
+        fmt_key = '-'.join(words)
+
+    else:
+        fmt_key = HEADER_KEY_ABBREV_RE.sub(
+            _upper_key,
+            HEADER_KEY_WORD_RE.sub(_upper_key, fmt_key),
+        )
+
+    if not (fmt_key in VALID_HEADER_ENTRIES or
+            fmt_key.startswith(UNKNOWN_PREFIX)):
+        fmt_key = UNKNOWN_PREFIX + fmt_key
+
+    if len(HEADER_KEY_CACHE) >= HEADER_KEY_CACHE_MAX:
+        # Don't let our cache grow without bounds
+        HEADER_KEY_CACHE.clear()
+
+    HEADER_KEY_CACHE[cache_key] = fmt_key
+    return fmt_key
+
 
 class NNTPHeader(NNTPMetaContent):
     """
@@ -78,27 +177,29 @@ class NNTPHeader(NNTPMetaContent):
         """
         Mimic Dictionary:  dict[key] = value
         """
-        key = self.__fmt_key(key)
+        key = _fmt_key(key)
         self.content[key] = item
 
     def __getitem__(self, key):
         """
         Mimic Dictionary:  value = dict[key]
         """
-        key = self.__fmt_key(key)
+        key = _fmt_key(key)
         return self.content[key]
 
     def post_iter(self):
         """
         Returns NNTP string as it would be required for posting
         """
+        content = self.content
+
         for k in HEADER_PRINT_SEQUENCE:
-            if k in self.content:
-                yield '%s: %s%s' % (k, self.content[k], NNTP_EOL)
+            if k in content:
+                yield HEADER_POST_FMT % (k, content[k])
 
-        for k, v in self.content.iteritems():
-            if k not in HEADER_PRINT_SEQUENCE:
-                yield '%s: %s%s' % (k, v, NNTP_EOL)
+        for k, v in content.iteritems():
+            if k not in HEADER_PRINT_SET:
+                yield HEADER_POST_FMT % (k, v)
 
         # Last entry
         yield NNTP_EOL
@@ -168,7 +269,7 @@ class NNTPHeader(NNTPMetaContent):
         """
         Mimic Dictionary:  dict.pop(key, default)
         """
-        key = self.__fmt_key(key)
+        key = _fmt_key(key)
         return self.content.pop(key, d)
 
     def str(self, delimiter=': ', eol='\r\n', count=0):
@@ -181,14 +282,18 @@ class NNTPHeader(NNTPMetaContent):
         This function attempts to honour print sequence allowing for a
         consistent output.
         """
-        response = []
-        for k in HEADER_PRINT_SEQUENCE:
-            if k in self.content:
-                response.append('%s%s%s' % (k, delimiter, self.content[k]))
+        content = self.content
+
+        # Our delimiter is built into the format we apply to every entry
+        fmt = '%s' + delimiter.replace('%', '%%') + '%s'
 
-        for k, v in self.content.iteritems():
-            if k not in HEADER_PRINT_SEQUENCE:
-                response.append('%s%s%s' % (k, delimiter, v))
+        response = [
+            fmt % (k, content[k]) for k in HEADER_PRINT_SEQUENCE
+            if k in content]
+
+        response += [
+            fmt % (k, v) for k, v in content.iteritems()
+            if k not in HEADER_PRINT_SET]
 
         return eol.join(response)
 
@@ -197,30 +302,6 @@ class NNTPHeader(NNTPMetaContent):
         """
         return self.str()
 
-    def __fmt_key(self, key):
-        """Formats the hash key for more consistent hits; hence fetching the
-        'Message-ID' key should still be fetched even if the user indexes
-        with 'message-id'.
-        """
-        def _fmt(_k):
-            return _k.group(1) + _k.group(2).upper()
-
-        if not isinstance(key, basestring):
-            # Handle invalid key entries types
-            key = str(key)
-
-        key = re.sub(
-            # Flip -id to ID (short for Identifier)
-            # Flip -crc to CRC (short for Cyclic Redundancy Check)
-            r'([_-])((id|crc)([^a-z0-9]|$))',
-            _fmt,
-            re.sub(r'(^|\s|[_-])(\S)', _fmt, key.strip().lower()),
-            flags=re.IGNORECASE,
-        )
-        if key in VALID_HEADER_ENTRIES or key.startswith(UNKNOWN_PREFIX):
-            return key
-        return UNKNOWN_PREFIX + key
-
     def article_exists(self):
         """
         Simply scans the header for keys that usually invalidate an article or
@@ -247,14 +328,14 @@ class NNTPHeader(NNTPMetaContent):
         """
         support 'in' keyword
         """
-        key = self.__fmt_key(key)
+        key = _fmt_key(key)
         return key in self.content
 
     def __delitem__(self, key):
         """
         allows the deletion of header keys
         """
-        key = self.__fmt_key(key)
+        key = _fmt_key(key)
         del self.content[key]
 
     def __repr__(self):
@@ -245,6 +245,10 @@ class NNTPManager(object):
         # Store our defined settings
         self._settings = settings
 
+        # The receive buffer size assigned to each of our connections (None
+        # leaves it up to the operating system)
+        self._recv_bufsize = None
+
         return
 
     def hooks(self, hooks, reset=True):
@@ -289,6 +293,9 @@ class NNTPManager(object):
 
                     connection.append(_connection)
 
+            # Apply our receive buffer size (to our backup servers too)
+            connection.set_recv_bufsize(self._recv_bufsize)
+
             # Append connection object to a pool
             self._pool.append(connection)
 
@@ -314,6 +321,16 @@ class NNTPManager(object):
 
         return False
 
+    def set_recv_bufsize(self, size):
+        """
+        Sets the receive buffer size (in bytes) of the connections in our
+        pool (and those we spawn later on).
+        """
+        self._recv_bufsize = size
+
+        for connection in self._pool:
+            connection.set_recv_bufsize(size)
+
     def get_connection(self):
         """
         Grabs a connection from the thread pool and returns it by reference.
@@ -731,9 +731,9 @@ class NNTPSegmentedPost(object):
 
     def __iter__(self):
         """
-        Grants usage of the next()
+        Iterates over our NNTPArticle objects (in the order they're sorted);
+        prefer this over accessing each of them by it's index.
         """
-        # Ensure our stream is open with read
         return iter(self.articles)
 
     def __len__(self):
@@ -933,7 +933,10 @@ class NNTPnzb(NNTPContent):
 
     def __iter__(self):
         """
-        Grants usage of the next()
+        Grants usage of the next(); each NNTPSegmentedPost object found in
+        our NZB-File is returned in turn. The file is parsed as we go unless
+        our segments were already loaded, so iterating is cheaper than
+        accessing them by index (which loads them all first).
         """
 
         # First get a ptr to the head of our data
@@ -30,6 +30,7 @@ from cryptography.x509.oid import NameOID
 import gevent.monkey
 gevent.monkey.patch_all()
 
+from os import fstat
 from os.path import isfile
 from datetime import datetime
 
@@ -39,6 +40,11 @@ import re
 # Hook Manager
 from .HookManager import HookManager
 
+from .Utils import ZERO_COPY_SUPPORT
+from .Utils import ZERO_COPY_BLOCK_SIZE
+if ZERO_COPY_SUPPORT:
+    from .Utils import sendfile
+
 # Logging
 import logging
 from .Logging import NEWSREAP_ENGINE
@@ -178,6 +184,10 @@ class SocketBase(object):
         self._keyfile = kwargs.get('keyfile', None)
         self._certfile = kwargs.get('certfile', None)
 
+        # The size (in bytes) of the kernel's receive buffer for our socket;
+        # None leaves it up to the operating system
+        self._recv_bufsize = kwargs.get('recv_bufsize', None)
+
         # For Statistics
         self.stat_connect_time = None
 
@@ -211,6 +221,17 @@ class SocketBase(object):
 
         return
 
+    def set_recv_bufsize(self, size):
+        """
+        Sets the size (in bytes) of the kernel's receive buffer used by our
+        socket. A larger buffer allows for fewer (but larger) reads on fast
+        links at the cost of the memory it occupies for each connection.
+
+        Set the size to None to leave it up to the operating system. The
+        change takes effect the next time we connect.
+        """
+        self._recv_bufsize = size
+
     def can_read(self, timeout=0.0):
         """
         Checks if there is data that can be read from the
@@ -443,6 +464,16 @@ class SocketBase(object):
             # Keep alive flag
             self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
 
+            if self._recv_bufsize:
+                # This must be set prior to connecting for the TCP window to
+                # be able to grow to match it
+                self.socket.setsockopt(
+                    socket.SOL_SOCKET, socket.SO_RCVBUF, self._recv_bufsize)
+
+            # Our commands are small; send them as soon as they're written
+            # (oppose to waiting to see if there is more to send with them)
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
             try:
                 # Simple protocol that returns if good, otherwise
                 # it throws an exception,  So the next line is always
@@ -1017,6 +1048,90 @@ class SocketBase(object):
 
         return tot_bytes
 
+    def sendfile(self, fd, offset=0, length=None):
+        """
+        Sends the content of the file descriptor specified (starting at the
+        offset specified) down our socket. If a length isn't specified, then
+        everything up to the end of the file is sent.
+
+        The content is handed off to the kernel (via sendfile()) so that it
+        never has to pass through Python. This isn't possible over a secure
+        connection (our content has to be encrypted first) or on platforms
+        that don't support it; None is returned in these cases (and nothing
+        is sent) so the caller can send() the content instead.
+
+        Otherwise the number of bytes sent is returned.
+        """
+        if not ZERO_COPY_SUPPORT or self.secure or not self.connected:
+            return None
+
+        if length is None:
+            length = fstat(fd).st_size - offset
+
+        # track bytes written
+        tot_bytes = 0
+
+        # Get reference time
+        cur_time = datetime.now()
+
+        while self.connected and tot_bytes < length:
+            stale_timeout = max(((length - tot_bytes) / 10800.0), 15.0)
+            if not self.can_write(stale_timeout):
+                # can't write down pipe; something has gone wrong
+                self.close()
+                raise SocketException('Connection write wait timeout')
+
+            try:
+                bytes_sent = sendfile(
+                    self.socket.fileno(), fd, offset + tot_bytes,
+                    min(length - tot_bytes, ZERO_COPY_BLOCK_SIZE),
+                )
+
+            except (IOError, OSError), e:
+                if e.errno in (errno.EAGAIN, errno.EINTR):
+                    # Wait until we can write again
+                    continue
+
+                elif tot_bytes == 0 and e.errno in (
+                        errno.EINVAL, errno.ENOSYS, errno.ENOTSOCK):
+                    # Not supported for these descriptors
+                    return None
+
+                # errno.EPIPE (Broken Pipe) usually at this point
+                self.close()
+                raise SocketException('Connection lost')
+
+            if not bytes_sent:
+                # We reached the end of our file
+                break
+
+            # Get our elapsed transfer time
+            elapsed_xfer_time = datetime.now() - cur_time
+            elapsed_xfer_time = (
+                (elapsed_xfer_time.days * 86400) +
+                elapsed_xfer_time.seconds +
+                (elapsed_xfer_time.microseconds / 1e6))
+            cur_time = datetime.now()
+
+            # Handle content sent
+            tot_bytes += bytes_sent
+
+            # Call write hook
+            self.hooks.call(
+                'socket_write',
+                # Host information
+                host=self._remote_addr,
+                port=self._remote_port,
+                # The number of bytes written
+                xfer_bytes=bytes_sent,
+                # The time it took to write these bytes
+                xfer_time=elapsed_xfer_time,
+                # Our sockets
+                socket=weakref.proxy(self),
+            )
+
+        return tot_bytes
+
     def local_connection_info(self):
         """
         Returns a tuple of current address of 'this' server
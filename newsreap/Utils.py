@@ -36,6 +36,9 @@ from os.path import basename
 from os.path import splitext
 from os.path import expanduser
 
+from shutil import copy as _copy
+from shutil import copymode
+
 # for pushd() popd() context
 from contextlib import contextmanager
 from os import getcwd
@@ -81,6 +84,20 @@ except ImportError:
     from imp import load_source
     PYTHON_3 = False
 
+try:
+    # Zero-copy support; Python v3.3+ provides this natively where as
+    # Python v2 can leverage the pysendfile package if it's installed
+    try:
+        from os import sendfile
+    except ImportError:
+        from sendfile import sendfile
+    ZERO_COPY_SUPPORT = True
+
+except ImportError:
+    # Zero-copy support not available; all copying is done by reading
+    # and writing blocks of data in Python (a much slower solution)
+    ZERO_COPY_SUPPORT = False
+
 # Logging
 import logging
 from newsreap.Logging import NEWSREAP_ENGINE
@@ -194,6 +211,10 @@ VALID_QUERY_RE = re.compile(r'^(.*[/\\])([^/\\]*)$')
 # The maximum number of recursive calls that can be made to rm
 RM_RECURSION_LIMIT = 100
 
+# The maximum number of bytes we ask the kernel to copy for us in a
+# single sendfile() call.
+ZERO_COPY_BLOCK_SIZE = 1048576
+
 
 def strsize_to_bytes(strsize):
     """
@@ -1387,3 +1408,67 @@ def dirsize(src):
 
     # Return our total size
     return size
+
+
+def zero_copy(dst_fd, src_fd, offset=0, length=None):
+    """
+    Copies the content of the src_fd file descriptor (starting at the offset
+    specified) to the dst_fd file descriptor at its current position. If a
+    length isn't specified, then everything up to the end of src_fd is
+    copied.
+
+    The copy is handed off to the kernel (via sendfile()) so that the data
+    never has to pass through Python.
+
+    The function returns the number of bytes copied or None if a zero copy
+    could not be performed (in which case nothing was written and the caller
+    should copy the content itself).
+    """
+    if not ZERO_COPY_SUPPORT:
+        return None
+
+    copied = 0
+    while length is None or copied < length:
+        block_size = ZERO_COPY_BLOCK_SIZE
+        if length is not None and length - copied < block_size:
+            block_size = length - copied
+
+        try:
+            bytes_sent = sendfile(dst_fd, src_fd, offset + copied, block_size)
+
+        except (IOError, OSError) as e:
+            if copied == 0 and e.errno in (
+                    errno.EINVAL, errno.ENOSYS, errno.ENOTSOCK):
+                # Not supported by our platform for these descriptors
+                return None
+            raise
+
+        if not bytes_sent:
+            # We reached the end of our source
+            break
+
+        copied += bytes_sent
+
+    return copied
+
+
+def copy(src, dst):
+    """
+    A shutil.copy() wrapper that has the kernel copy the file for us when
+    it can.
+
+    Just like shutil.copy(), the permission bits are copied along with the
+    content.
+    """
+    if not ZERO_COPY_SUPPORT or isdir(dst):
+        return _copy(src, dst)
+
+    with open(src, 'rb') as fsrc:
+        with open(dst, 'wb') as fdst:
+            copied = zero_copy(fdst.fileno(), fsrc.fileno())
+
+    if copied is None:
+        # Zero-copy isn't possible
+        return _copy(src, dst)
+
+    copymode(src, dst)
@@ -39,6 +39,10 @@ setup(
     data_files=[('share/newsreap', ['config.yaml', ]), ],
     test_suite='tests',
     install_requires=open('requirements.txt').readlines(),
+    extras_require={
+        # Zero-copy transfers (sendfile()) on Python v2
+        'sendfile': ['pysendfile', ],
+    },
     classifiers=(
         'Natural Language :: English',
         'Programming Language :: Python',
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+#
+# Test the NNTPConnectionRequest Object
+#
+# Copyright (C) 2017 Chris Caron <lead2gold@gmail.com>
+#
+# This program is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+
+import sys
+if 'threading' in sys.modules:
+    #  gevent patching since pytests import
+    #  the sys library before we do.
+    del sys.modules['threading']
+
+import gevent.monkey
+gevent.monkey.patch_all()
+
+from os.path import dirname
+from os.path import abspath
+
+try:
+    from tests.TestBase import TestBase
+
+except ImportError:
+    sys.path.insert(0, dirname(dirname(abspath(__file__))))
+    from tests.TestBase import TestBase
+
+from newsreap.NNTPConnection import NNTPConnection
+from newsreap.NNTPConnectionRequest import NNTPConnectionRequest
+
+
+class EchoConnection(NNTPConnection):
+    """
+    A connection that returns what it was asked to stat() instead of asking
+    an NNTP Server.
+
+    """
+    def stat(self, id, *args, **kwargs):
+        return (id, kwargs)
+
+
+class NNTPConnectionRequest_Test(TestBase):
+    """
+    A Class for testing NNTPConnectionRequest
+
+    """
+
+    def test_actions(self):
+        """
+        Actions are validated when our request is created and executed
+        against the connection we're run with
+
+        """
+        request = NNTPConnectionRequest([
+            ('stat', ('ABCD', ), {'full': True}),
+            ('stat', ('ABCE', )),
+        ])
+
+        assert request.run(EchoConnection()) is True
+        assert request.is_set()
+        assert request.response == [
+            ('ABCD', {'full': True}),
+            ('ABCE', {}),
+        ]
+
+        # Functions our connection doesn't have can never be called
+        for name in ('invalid', 'Stat', '_get', '__init__',
+                     'MAX_BUFFER_SIZE', None):
+            try:
+                NNTPConnectionRequest([('stat', ('ABCD', )), (name, )])
+                assert False
+
+            except AttributeError as e:
+                assert str(name) in str(e)
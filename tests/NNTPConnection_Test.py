@@ -29,6 +29,8 @@ gevent.monkey.patch_all()
 #        keyerror-in-module-threading-after-a-successful-py-test-run
 import threading
 
+from gevent import socket
+
 import unittest
 import os
 
@@ -129,6 +131,31 @@ class NNTPConnection_Test(TestBase):
         # Invalid Password
         assert sock.connect(timeout=5.0) is False
 
+    def test_socket_options(self):
+        """
+        Test the options applied to our socket when we connect
+        """
+        sock = NNTPConnection(
+            host=self.nttp_ipaddr,
+            port=self.nntp_portno,
+            username='valid',
+            password='valid',
+            secure=False,
+            join_group=False,
+            recv_bufsize=65536,
+        )
+        assert sock.connect(timeout=5.0) is True
+
+        # Commands are sent as soon as they're written
+        assert sock.socket.getsockopt(
+            socket.IPPROTO_TCP, socket.TCP_NODELAY) != 0
+
+        # The kernel may adjust our receive buffer further but it's never
+        # smaller then what we asked for
+        assert sock.socket.getsockopt(
+            socket.SOL_SOCKET, socket.SO_RCVBUF) >= 65536
+        sock.close()
+
     @unittest.skipIf(os.environ.get("TRAVIS") == "true",
                      "Skipping this test on Travis CI.")
     def test_secure_authentication(self):
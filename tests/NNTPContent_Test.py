@@ -20,9 +20,14 @@ if 'threading' in sys.modules:
     #  the sys library before we do.
     del sys.modules['threading']
 
+import gevent
 import gevent.monkey
 gevent.monkey.patch_all()
 
+import unittest
+import zlib
+import hashlib
+from gevent import socket
 from blist import sortedset
 from os.path import join
 from os.path import isdir
@@ -46,11 +51,15 @@ except ImportError:
 from newsreap.NNTPAsciiContent import NNTPAsciiContent
 from newsreap.NNTPBinaryContent import NNTPBinaryContent
 from newsreap.NNTPContent import NNTPContent
+from newsreap.NNTPContent import hash_many
+from newsreap.NNTPContent import WRITE_BUFFER_SIZE
 from newsreap.NNTPSettings import DEFAULT_BLOCK_SIZE as BLOCK_SIZE
+from newsreap.SocketBase import SocketBase
 from newsreap.Utils import strsize_to_bytes
 from newsreap.Utils import bytes_to_strsize
 from newsreap.Utils import mkdir
 from newsreap.Utils import stat
+from newsreap.Utils import ZERO_COPY_SUPPORT
 
 
 class NNTPContent_Test(TestBase):
@@ -424,6 +433,136 @@ class NNTPContent_Test(TestBase):
         assert(sha1 == sha1_2)
         assert(sha256 == sha256_2)
 
+    def test_checksum_cache(self):
+        """Test that our cached checksums are kept up to date as we write
+        """
+        # Create a new content object
+        content_a = NNTPContent(work_dir=self.tmp_dir)
+        content_a.write(urandom(BLOCK_SIZE * 3))
+
+        # Calculate (and cache) our checksums
+        crc32 = content_a.crc32()
+        md5 = content_a.md5()
+        sha1 = content_a.sha1()
+        assert(crc32 is not None)
+        assert(md5 is not None)
+        assert(sha1 is not None)
+        assert(content_a.crc32() == crc32)
+        assert(content_a.md5() == md5)
+
+        # Continue writing to the end of our file
+        content_a.open(eof=True)
+        content_a.write(urandom(BLOCK_SIZE))
+        content_a.write(urandom(100))
+        assert(content_a.crc32() != crc32)
+        assert(content_a.md5() != md5)
+
+        # Our checksums should match that of a copy of the same content
+        content_b = NNTPContent(work_dir=self.tmp_dir)
+        content_b.write(content_a.getvalue())
+        assert(content_a.crc32() == content_b.crc32())
+        assert(content_a.md5() == content_b.md5())
+        assert(content_a.sha1() == content_b.sha1())
+
+        # Over-write some of the content at the head of our file
+        content_a.open()
+        content_a.write('X' * 10)
+        content_a.close()
+        assert(content_a.crc32() != content_b.crc32())
+        assert(content_a.md5() != content_b.md5())
+
+        content_b.open()
+        content_b.write('X' * 10)
+        content_b.close()
+        assert(content_a.crc32() == content_b.crc32())
+        assert(content_a.md5() == content_b.md5())
+
+        # Appending content also updates our crc32
+        content_c = NNTPContent(work_dir=self.tmp_dir)
+        content_c.write(urandom(100))
+        crc32 = content_a.crc32()
+        assert(content_a.append(content_c) is True)
+        assert(content_a.crc32() != crc32)
+
+        content_b.append(content_c)
+        assert(content_a.crc32() == content_b.crc32())
+        assert(content_a.md5() == content_b.md5())
+
+        # Large content is hashed through a memory map; the results are no
+        # different then if it were read in blocks
+        data = urandom(strsize_to_bytes('2M'))
+        content_a = NNTPContent(work_dir=self.tmp_dir)
+        content_a.write(data[:100])
+        assert(content_a.md5() == hashlib.md5(data[:100]).hexdigest())
+        content_a.open(eof=True)
+        content_a.write(data[100:])
+        assert(content_a.md5() == hashlib.md5(data).hexdigest())
+        assert(content_a.sha256() == hashlib.sha256(data).hexdigest())
+        assert(content_a.crc32() ==
+               format(zlib.crc32(data) & 0xffffffffL, '08x'))
+
+        # Content appended to us is never hidden by a memory map we made of
+        # our content before it was appended
+        content_a = NNTPContent(work_dir=self.tmp_dir)
+        content_a.write(data[:1000])
+        content_a.close()
+        for _data in (data[1000:1010], data[1010:1020]):
+            content_c = NNTPContent(work_dir=self.tmp_dir)
+            content_c.write(_data)
+            assert(content_a.getvalue() is not None)
+            assert(content_a.append(content_c) is True)
+        assert(content_a.getvalue() == data[:1020])
+
+        # The same goes for our (large) hashed content
+        content_a = NNTPContent(work_dir=self.tmp_dir)
+        content_a.write(data[:-200])
+        content_a.close()
+        assert(content_a.md5() == hashlib.md5(data[:-200]).hexdigest())
+        for offset in (-200, -100):
+            content_c = NNTPContent(work_dir=self.tmp_dir)
+            content_c.write(data[offset:offset + 100 or None])
+            assert(content_a.append(content_c) is True)
+            assert(content_a.md5() ==
+                   hashlib.md5(data[:offset + 100 or None]).hexdigest())
+            assert(content_a.crc32() == format(
+                zlib.crc32(data[:offset + 100 or None]) & 0xffffffffL, '08x'))
+        assert(content_a.getvalue() == data)
+
+        # Several digests can be calculated at once (even when some of them
+        # have already been partially calculated)
+        content_a.open(eof=True)
+        content_a.write('X' * 10)
+        data += 'X' * 10
+        assert(content_a.digests() == {
+            'md5': hashlib.md5(data).hexdigest(),
+            'sha1': hashlib.sha1(data).hexdigest(),
+            'sha256': hashlib.sha256(data).hexdigest(),
+        })
+        assert(content_a.digests(('sha1', )) == {
+            'sha1': hashlib.sha1(data).hexdigest(),
+        })
+
+        # An already writable stream is hashed as is; we can continue to
+        # write to it afterwards without having to re-open it
+        ptr = content_a.tell()
+        assert(content_a.md5() == hashlib.md5(data).hexdigest())
+        assert(content_a.tell() == ptr)
+        content_a.write('Y' * 10)
+        data += 'Y' * 10
+        assert(content_a.md5() == hashlib.md5(data).hexdigest())
+
+        # Many content objects can be hashed at once
+        contents = []
+        for size in (0, 100, BLOCK_SIZE * 10, strsize_to_bytes('2M')):
+            content = NNTPContent(work_dir=self.tmp_dir)
+            content.write(urandom(size))
+            contents.append(content)
+
+        assert(hash_many(contents) == [c.sha256() for c in contents])
+        assert(hash_many(contents, 'crc32', max_workers=2) ==
+               [c.crc32() for c in contents])
+        assert(hash_many(contents[:1], 'md5') == [contents[0].md5()])
+
     def test_saves(self):
         """
         Saving allows for a variety of inputs, test that they all
@@ -530,6 +669,150 @@ class NNTPContent_Test(TestBase):
             data_read = f.read()
         assert(data == data_read)
 
+    def test_sorting(self):
+        """
+        Content is sorted by it's key() which is kept up to date as the
+        content is changed.
+        """
+        content_a = NNTPContent(work_dir=self.tmp_dir, part=1)
+        content_b = NNTPContent(work_dir=self.tmp_dir, part=2)
+        assert(content_a.key() == '10000//00001')
+        assert(content_a < content_b)
+        assert(not content_b < content_a)
+
+        # Changing our part changes our key
+        content_a.part = 3
+        assert(content_a.key() == '10000//00003')
+        assert(content_b < content_a)
+
+        content_a.filename = 'a'
+        assert(content_a.key() == '10000/a/00003')
+        assert(content_a > content_b)
+        assert(content_a >= content_b)
+        assert(content_b <= content_a)
+        assert(content_a != content_b)
+
+        # Content sharing the same key is considered equal
+        content_b.filename = 'a'
+        content_b.part = 3
+        assert(content_a == content_b)
+        assert(not content_a != content_b)
+
+    def test_buffered_writes(self):
+        """
+        Small writes are held in memory before they're written to disk; make
+        sure they're always accounted for.
+        """
+        content = NNTPContent(work_dir=self.tmp_dir)
+
+        # Write enough small chunks that we'll have to write some of them
+        # to disk along the way
+        data = 'x' * 127 + '\n'
+        for _ in range(1000):
+            content.write(data)
+
+        # Our length and pointer consider everything we've written
+        assert(len(content) == len(data) * 1000)
+        assert(content.tell() == len(data) * 1000)
+
+        # Large writes are written as is
+        content.write('y' * (BLOCK_SIZE * 10))
+        content.write('z')
+
+        # Our length is kept up to date
+        assert(len(content) == len(data) * 1000 + BLOCK_SIZE * 10 + 1)
+
+        assert(content.getvalue() ==
+               data * 1000 + 'y' * (BLOCK_SIZE * 10) + 'z')
+
+        # Content held in memory is written when our file is closed
+        content.open()
+        content.write('abc')
+        content.close()
+        assert(content.getvalue()[:4] == 'abcx')
+
+    def test_inline_content(self):
+        """
+        Small content is held in memory until it's path is needed
+        """
+        content = NNTPContent(work_dir=self.tmp_dir)
+        content.write('abc')
+        content.write('def')
+
+        # Nothing has been written to disk
+        assert(content.stream is None)
+        assert(len(content) == 6)
+        assert(content.tell() == 6)
+        assert(content.getvalue() == 'abcdef')
+        assert(content.crc32() == '4b8e39ef')
+        assert(content.stream is not None)
+
+        # Closing our content places it on disk where it's read back from
+        content = NNTPContent(work_dir=self.tmp_dir)
+        content.write('abc')
+        content.close()
+        assert(content.stream is None)
+        assert(isfile(content.filepath) is True)
+        assert(content.read() == 'abc')
+        content.close()
+
+        # Asking for our path always places our content on disk
+        content = NNTPContent(work_dir=self.tmp_dir)
+        content.write('abc')
+        assert(isfile(content.filepath) is True)
+        assert(content.getvalue() == 'abc')
+
+        # Content that grows too large is written to disk
+        content = NNTPContent(work_dir=self.tmp_dir)
+        content.write('abc')
+        content.write('x' * (BLOCK_SIZE * 10))
+        assert(content.stream is not None)
+        assert(content.getvalue() == 'abc' + 'x' * (BLOCK_SIZE * 10))
+
+        # Content buffered by write() is written where it was written to us
+        # even if our stream is moved around before it's flushed
+        content = NNTPContent(work_dir=self.tmp_dir)
+        content.write('a' * (WRITE_BUFFER_SIZE + 10))
+        content.write('b' * 10)
+        content.stream.seek(0)
+        assert(content.stream.read(5) == 'aaaaa')
+        assert(len(content) == WRITE_BUFFER_SIZE + 20)
+        assert(content.getvalue() ==
+               'a' * (WRITE_BUFFER_SIZE + 10) + 'b' * 10)
+
+        # Content still being buffered by write() is part of what we read
+        # back even if nothing else has flushed it for us (such as len())
+        content = NNTPContent(work_dir=self.tmp_dir)
+        content.write('a' * (WRITE_BUFFER_SIZE + 1))
+        content.write('b' * 10)
+        content.write('c' * 10)
+        assert(content.getvalue() ==
+               'a' * (WRITE_BUFFER_SIZE + 1) + 'b' * 10 + 'c' * 10)
+
+    def test_length(self):
+        """
+        Our length always reflects the content of our file; even when it's
+        changed without us
+        """
+        content = NNTPContent(work_dir=self.tmp_dir)
+        content.write('a' * 300000)
+        assert(len(content) == 300000)
+
+        # Written to our stream directly
+        content.stream.seek(0, 2)
+        content.stream.write('b' * 4)
+        assert(len(content) == 300004)
+        content.close()
+        assert(len(content) == 300004)
+
+        # Re-written by something else entirely
+        with open(content.filepath, 'ab') as fp:
+            fp.write('c' * 6)
+        assert(len(content) == 300010)
+        assert(content.open())
+        assert(len(content) == 300010)
+        content.close()
+
     def test_directory_support(self):
         """
         NNTPContent objects can wrap directories too
@@ -750,6 +1033,48 @@ class NNTPContent_Test(TestBase):
         assert(len(content_a) == len(content_b))
         assert(content_a.md5() == content_b.md5())
 
+    @unittest.skipIf(not ZERO_COPY_SUPPORT,
+                     'Zero-copy (sendfile()) is not supported.')
+    def test_sendfile(self):
+        """
+        Content can be sent down a socket by the kernel
+        """
+        (sock_a, sock_b) = socket.socketpair()
+        sock = SocketBase()
+        sock.socket = sock_a
+        sock.connected = True
+
+        # More content then our socket can buffer at once
+        data = urandom(strsize_to_bytes('512K'))
+        content = NNTPContent(work_dir=self.tmp_dir)
+        content.write(data)
+        content.close()
+
+        received = []
+
+        def receive():
+            while sum(len(r) for r in received) < len(data):
+                received.append(sock_b.recv(65536))
+
+        receiver = gevent.spawn(receive)
+        result = content.sendfile(sock)
+        receiver.join()
+        assert(result == len(data))
+        assert(''.join(received) == data)
+
+        # We don't leave our content open behind us
+        assert(content.stream is None)
+
+        # Content that was already open is left that way
+        received[:] = []
+        assert(content.open())
+        receiver = gevent.spawn(receive)
+        assert(content.sendfile(sock) == len(data))
+        receiver.join()
+        assert(''.join(received) == data)
+        assert(content.stream is not None)
+        content.close()
+
     def test_with(self):
         """
         Test the use of the with clause
@@ -27,6 +27,7 @@ gevent.monkey.patch_all()
 #        keyerror-in-module-threading-after-a-successful-py-test-run
 import threading
 
+from StringIO import StringIO
 from os.path import join
 from os.path import isfile
 from os.path import dirname
@@ -45,6 +46,8 @@ except ImportError:
 from newsreap.NNTPCryptography import NNTPCryptography
 from newsreap.NNTPCryptography import CRYPTOGRAPHY_HASH_MAP
 from newsreap.NNTPCryptography import HashType
+from newsreap.NNTPCryptography import KeySize
+from newsreap.NNTPCryptography import openssl_version
 from newsreap.NNTPBinaryContent import NNTPBinaryContent
 from newsreap.codecs.CodecUU import CodecUU
 
@@ -63,6 +66,10 @@ class NNTPCryptography_Test(TestBase):
         # Create our Cryptography Object
         obj = NNTPCryptography()
 
+        # We know what our backend is linked against
+        assert(openssl_version() is not None)
+        assert(openssl_version() is openssl_version())
+
         # We can't save if we haven't created keys yet
         assert(obj.save() is False)
 
@@ -197,6 +204,13 @@ class NNTPCryptography_Test(TestBase):
         # Test it out
         assert(str(content) == str(decrypted))
 
+        # Nothing to decrypt
+        assert(obj.decrypt('') == '')
+
+        # Encrypted content is always the size of our key
+        assert(obj.decrypt(encrypted[:-1]) is None)
+        assert(obj.decrypt(encrypted + 'X') is None)
+
         # Note that the Hash value is important as encryption
         # and decryption will fail otherwise
         encrypted = obj.encrypt(
@@ -222,6 +236,44 @@ class NNTPCryptography_Test(TestBase):
         # It will succeed again
         assert(str(content) == str(decrypted))
 
+        # Larger content can be encrypted and decrypted in chunks
+        content = 'newsreap' * 100
+        encrypted = ''.join(obj.encrypt_stream(content))
+        assert(len(encrypted) ==
+               (len(content) // obj.chunk_size() + 1) * prv.key_size // 8)
+        assert(''.join(obj.decrypt_stream(encrypted)) == content)
+        assert(list(obj.decrypt_stream(encrypted[1:]))[-1] is None)
+
+        # File-like objects can be streamed too
+        content = 'newsreap' * 4096
+        encrypted = ''.join(obj.encrypt_stream(StringIO(content)))
+        assert(''.join(obj.decrypt_stream(encrypted)) == content)
+        assert(''.join(obj.decrypt_stream(StringIO(encrypted))) == content)
+
+        # Weaker (smaller) keys can stream content too; our chunks are sized
+        # by the key we're using
+        weak = NNTPCryptography()
+        (wprv, wpub) = weak.genkeys(key_size=KeySize.WEAK)
+        assert(weak.chunk_size() == KeySize.WEAK // 8 - 2 * 32 - 2)
+        assert(weak.chunk_size(HashType.SHA512) ==
+               KeySize.WEAK // 8 - 2 * 64 - 2)
+        assert(weak.chunk_size() < obj.chunk_size())
+        content = 'newsreap' * 100
+        encrypted = list(weak.encrypt_stream(content))
+        assert(None not in encrypted)
+        assert(''.join(weak.decrypt_stream(''.join(encrypted))) == content)
+        encrypted = list(weak.encrypt_stream(StringIO(content)))
+        assert(None not in encrypted)
+        assert(''.join(weak.decrypt_stream(''.join(encrypted))) == content)
+
+        # Several payloads can be encrypted and decrypted at once
+        payloads = ['newsreap%d' % no for no in range(10)]
+        encrypted = obj.encrypt_many(payloads)
+        assert(len(encrypted) == len(payloads))
+        assert(obj.decrypt_many(encrypted) == payloads)
+        assert(obj.decrypt_many(encrypted[:1], max_workers=4) == payloads[:1])
+        assert(obj.decrypt_many([]) == [])
+
         # Our private Key Location
         tmp_file = join(
             self.tmp_dir,
@@ -297,3 +349,22 @@ class NNTPCryptography_Test(TestBase):
 
         assert (obj.decode_private_key(encoded_prv) is True)
         assert (obj.decode_public_key(encoded_pub) is True)
+
+        # Keys decoded into another object are considered the same
+        other = NNTPCryptography()
+        assert (other.decode_public_key(encoded_pub) is True)
+        assert (other == obj)
+        assert (other.public_pem() is other.public_pem())
+
+        # Our thumbprint identifies our key pair
+        assert (len(other.thumbprint()) == 32)
+        assert (other.thumbprint() == obj.thumbprint())
+        assert (hash(other) == hash(obj))
+        assert (len(set([other, obj])) == 1)
+        assert (NNTPCryptography().thumbprint() is None)
+
+        # But not once different keys are generated
+        other.genkeys()
+        assert (not other == obj)
+        assert (other != obj)
+        assert (other.thumbprint() != obj.thumbprint())
@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+#
+# Test the NNTPGetFactory Object
+#
+# Copyright (C) 2017 Chris Caron <lead2gold@gmail.com>
+#
+# This program is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+
+import sys
+if 'threading' in sys.modules:
+    #  gevent patching since pytests import
+    #  the sys library before we do.
+    del sys.modules['threading']
+
+import gevent.monkey
+gevent.monkey.patch_all()
+
+# Import threading after monkey patching
+# see: http://stackoverflow.com/questions/8774958/\
+#        keyerror-in-module-threading-after-a-successful-py-test-run
+import threading
+
+from os import environ
+from os import getcwd
+from os.path import dirname
+from os.path import abspath
+from os.path import join
+from os.path import isdir
+from os.path import isfile
+from time import time
+from time import sleep
+from gevent.threadpool import ThreadPool
+
+try:
+    from tests.TestBase import TestBase
+
+except ImportError:
+    sys.path.insert(0, dirname(dirname(abspath(__file__))))
+    from tests.TestBase import TestBase
+
+from newsreap.NNTPGetFactory import NNTPGetFactory
+from newsreap.NNTPConnection import NNTPConnection
+from newsreap.NNTPArticle import NNTPArticle
+from newsreap.NNTPBinaryContent import NNTPBinaryContent
+from newsreap.NNTPSegmentedPost import NNTPSegmentedPost
+from newsreap.NNTPnzb import NNTPnzb
+from newsreap.Utils import pushd
+
+
+class FakeConnection(NNTPConnection):
+    """
+    A connection that never touches the network; each article requested is
+    loaded with the content found in our payload instead (keyed by it's
+    Message-ID) the same way an NNTPManager loads it's responses.
+
+    """
+    def __init__(self, payload, *args, **kwargs):
+        super(FakeConnection, self).__init__(*args, **kwargs)
+        self.payload = payload
+
+    def get(self, id, work_dir=None, *args, **kwargs):
+        for segpost in iter(id):
+            for article in iter(segpost):
+                filename, part, total_parts, data = self.payload[article.id]
+
+                response = NNTPArticle(article.id, work_dir=work_dir)
+                content = NNTPBinaryContent(
+                    filename, part=part, total_parts=total_parts,
+                    work_dir=work_dir,
+                )
+                content.write(data)
+                response.add(content)
+
+                article.load(response)
+
+        return None
+
+
+class SlowJoinGetFactory(NNTPGetFactory):
+    """
+    Joins each segment slower then the one that follows it; so they're
+    assembled in the reverse order they were handed to us.
+
+    """
+    def __init__(self, *args, **kwargs):
+        super(SlowJoinGetFactory, self).__init__(*args, **kwargs)
+        self.joined = []
+        self.saved = []
+
+    def _pool(self):
+        # Join all of our segments at once (regardless of how many cpus we
+        # have) so that the order they're joined in is up to us
+        if self._threadpool is None:
+            self._threadpool = ThreadPool(3)
+
+        return self._threadpool
+
+    def _join(self, segment):
+        # Our segments are identified by the Message-ID of their first part
+        msgid = next(iter(segment)).id
+        sleep(0.1 * (3 - int(msgid[4])))
+        self.joined.append(msgid)
+
+        # Track the order our segments are saved in
+        save = segment.save
+
+        def _save(*args, **kwargs):
+            self.saved.append(msgid)
+            return save(*args, **kwargs)
+
+        segment.save = _save
+        return super(SlowJoinGetFactory, self)._join(segment)
+
+
+class NNTPGetFactory_Test(TestBase):
+    """
+    A Class for testing NNTPGetFactory
+
+    """
+
+    def test_load_path(self):
+        """
+        The path we're asked to download to is always made absolute
+
+        """
+        factory = NNTPGetFactory(connection=NNTPConnection())
+
+        # No path specified; a Message-ID is retrieved to where we are
+        assert factory.load('<abcd@newsreap.test>') is True
+        assert factory.base_path == getcwd()
+        assert factory.path == factory.base_path
+        assert factory.name == 'abcd@newsreap.test'
+
+        # A relative path is relative to where we are
+        with pushd(self.tmp_dir):
+            assert factory.load(
+                '<abcd@newsreap.test>', path='relative/path') is True
+        assert factory.base_path == join(self.tmp_dir, 'relative', 'path')
+        assert factory.path == factory.base_path
+        assert isdir(factory.base_path)
+        assert factory.tmp_path == \
+            join(factory.base_path, 'abcd@newsreap.test.tmp')
+        assert factory.db_path == \
+            join(factory.base_path, 'abcd@newsreap.test.db')
+
+        # The user's home directory is expanded
+        home = environ.get('HOME')
+        environ['HOME'] = self.tmp_dir
+        try:
+            assert factory.load(
+                '<abcd@newsreap.test>', path='~/home/path') is True
+
+        finally:
+            if home is None:
+                del environ['HOME']
+
+            else:
+                environ['HOME'] = home
+
+        assert factory.base_path == join(self.tmp_dir, 'home', 'path')
+        assert isdir(factory.base_path)
+
+        # Anything we can't retrieve is never loaded
+        assert factory.load('not a message-id') is False
+        assert factory.download() is False
+
+    def test_transfer_rates(self):
+        """
+        Our transfer speeds are averaged over the last few reads we've
+        accounted for
+
+        """
+        factory = NNTPGetFactory(connection=NNTPConnection())
+        assert factory.xfer_rx_total == 0
+        assert factory.xfer_rate_avg == 0
+
+        # Small reads are accumulated until there are enough of them
+        factory.transfer_rates(1000, 0.01)
+        assert factory.xfer_rx_total == 0
+        assert factory.xfer_rate_avg == 0
+
+        factory.transfer_rates(factory.xfer_flush_bytes - 1000, 0.99)
+        assert factory.xfer_rx_total == factory.xfer_flush_bytes
+        assert factory.xfer_rate_avg == factory.xfer_flush_bytes
+
+        # ... or until enough time has passed since we last accounted for
+        # them
+        factory.transfer_rates(100, 0.5)
+        assert factory.xfer_rx_total == factory.xfer_flush_bytes
+
+        factory._xfer_last_flush = time() - (2 * factory.xfer_flush_interval)
+        factory.transfer_rates(100, 0.5)
+        assert factory.xfer_rx_total == factory.xfer_flush_bytes + 200
+        assert factory.xfer_rate_avg == (factory.xfer_flush_bytes + 200) / 2.0
+
+        # Reads too fast to time (or timed by a clock that went backwards)
+        # are counted but have no bearing on our speed
+        factory.transfer_rates(factory.xfer_flush_bytes, 0.0)
+        factory.transfer_rates(factory.xfer_flush_bytes, -1.0)
+        assert factory.xfer_rx_total == (3 * factory.xfer_flush_bytes) + 200
+        assert factory.xfer_rate_avg == (factory.xfer_flush_bytes + 200) / 2.0
+
+        # Only our most recent speeds are averaged
+        for _ in range(factory.xfer_rate_max_queue_size):
+            factory.transfer_rates(factory.xfer_flush_bytes, 2.0)
+        assert factory.xfer_rate_avg == factory.xfer_flush_bytes / 2.0
+        assert len(factory.xfer_rate) == factory.xfer_rate_max_queue_size
+
+        for no in range(1, factory.xfer_rate_max_queue_size + 1):
+            factory.transfer_rates(factory.xfer_flush_bytes, 1.0 / no)
+
+        assert factory.xfer_rate_avg == sum(
+            factory.xfer_flush_bytes * no for no in
+            range(1, factory.xfer_rate_max_queue_size + 1)) / \
+            float(factory.xfer_rate_max_queue_size)
+
+        # Our socket reads are tracked through our hooks
+        factory.hooks.call(
+            'socket_read', xfer_bytes=factory.xfer_flush_bytes, xfer_time=1.0)
+        assert factory.xfer_rate[factory._xfer_rate_idx - 1] == \
+            factory.xfer_flush_bytes
+
+        # Loading new content resets everything
+        factory.transfer_rates(10, 0.01)
+        assert factory.load('<abcd@newsreap.test>') is True
+        assert factory.xfer_rx_total == 0
+        assert factory.xfer_rate_avg == 0
+        assert factory._xfer_pending_bytes == 0
+        assert sum(factory.xfer_rate) == 0.0
+
+    def test_download(self):
+        """
+        Download the content of an NZB-File
+
+        """
+        # Our content; keyed by Message-ID
+        payload = {}
+
+        nzbfile = join(self.tmp_dir, 'NNTPGetFactory_Test.nzb')
+        nzbobj = NNTPnzb()
+        nzbobj.meta = {'name': 'NNTPGetFactory_Test'}
+
+        for fileno in range(3):
+            filename = 'file%d.dat' % fileno
+            segpost = NNTPSegmentedPost(
+                filename,
+                subject='"%s" yEnc' % filename,
+                poster='newsreap <noreply@newsreap.com>',
+                groups='alt.binaries.test',
+            )
+
+            for part in range(1, 4):
+                msgid = '%s.%d@newsreap.test' % (filename, part)
+                payload[msgid] = (
+                    filename, part, 3, ('%d.%d|' % (fileno, part)) * 1000)
+
+                article = NNTPArticle(
+                    msgid,
+                    subject='"%s" yEnc (%d/3)' % (filename, part),
+                    poster='newsreap <noreply@newsreap.com>',
+                    groups='alt.binaries.test',
+                    work_dir=self.tmp_dir,
+                )
+                article.no = part
+
+                content = NNTPBinaryContent(
+                    part=part, total_parts=3, work_dir=self.tmp_dir)
+                content.write(payload[msgid][3])
+                article.add(content)
+                segpost.add(article)
+
+            nzbobj.add(segpost)
+
+        assert nzbobj.save(nzbfile) is True
+
+        factory = SlowJoinGetFactory(connection=FakeConnection(payload))
+        assert factory.load(nzbfile, path=self.out_dir) is True
+        assert factory.path == join(self.out_dir, 'NNTPGetFactory_Test')
+
+        # Anything received but not yet accounted for is accounted for once
+        # we're done
+        factory.transfer_rates(10, 0.01)
+        assert factory.xfer_rx_total == 0
+
+        try:
+            assert factory.download() is True
+
+        finally:
+            factory._close_pool()
+
+        assert factory.xfer_rx_total == 10
+
+        # Our segments were joined out of order but saved in the order
+        # they were found in our NZB-File
+        assert factory.joined == [
+            'file2.dat.1@newsreap.test',
+            'file1.dat.1@newsreap.test',
+            'file0.dat.1@newsreap.test',
+        ]
+        assert factory.saved == [
+            'file0.dat.1@newsreap.test',
+            'file1.dat.1@newsreap.test',
+            'file2.dat.1@newsreap.test',
+        ]
+
+        # Each file is assembled from it's parts in order
+        for fileno in range(3):
+            filepath = join(factory.path, 'file%d.dat' % fileno)
+            assert isfile(filepath)
+            with open(filepath, 'rb') as fp:
+                assert fp.read() == ''.join(
+                    ('%d.%d|' % (fileno, part)) * 1000
+                    for part in range(1, 4))
@@ -56,6 +56,22 @@ class NNTPGroup_Test(TestBase):
             except AttributeError:
                 assert(True)
 
+        # Equality (and inequality) against strings and other groups
+        group = NNTPGroup('a.b.test')
+        assert(group == 'alt.binaries.test')
+        assert(group == 'a.b.test')
+        assert(group == NNTPGroup('alt.binaries.test'))
+        assert(not group != 'alt.binaries.test')
+        assert(not group != NNTPGroup('alt.binaries.test'))
+        assert(group != 'alt.binaries.other')
+        assert(group != NNTPGroup('alt.binaries.other'))
+        assert(group != None)
+
+        # The same group is only ever represented by one object
+        assert(group is NNTPGroup('alt.binaries.test'))
+        assert(group is NNTPGroup(group))
+        assert(group is not NNTPGroup('alt.binaries.other'))
+
     def test_normalize(self):
         """
         Tests the normalize() function
@@ -111,6 +127,13 @@ class NNTPGroup_Test(TestBase):
         assert(NNTPGroup.normalize('a.binaries.sounds')
                == 'alt.binaries.sounds')
 
+        # Our results are cached; make sure we get the same result (of the
+        # same type) the second time around
+        assert(NNTPGroup.normalize('a.b') == 'alt.binaries')
+        assert(isinstance(NNTPGroup.normalize(u'alt.test'), unicode))
+        assert(isinstance(NNTPGroup.normalize('alt.test'), str))
+        assert(NNTPGroup.normalize('a.b', shorthand=False) == 'a.b')
+
     def test_split(self):
         """
         Tests the split() function
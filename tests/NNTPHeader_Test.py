@@ -36,6 +36,8 @@ except ImportError:
 
 from newsreap.NNTPHeader import NNTPHeader
 from newsreap.NNTPHeader import HEADER_PRINT_SEQUENCE
+from newsreap.NNTPHeader import HEADER_KEY_CACHE
+from newsreap.NNTPHeader import HEADER_KEY_CACHE_MAX
 
 
 class NNTPHeader_Test(TestBase):
@@ -89,7 +91,51 @@ class NNTPHeader_Test(TestBase):
         assert (hdr.keys()[0] != 'My-Identifier')
         assert (hdr.keys()[0] == 'X-My-Identifier')
 
+        # Keys we've already formatted are cached; make sure a key we've
+        # looked up before is still formatted the same way the next time
+        hdr2 = NNTPHeader()
+        hdr2['my-identifier'] = 'Test3'
+        assert hdr2.keys()[0] == 'X-My-Identifier'
+        assert hdr2['MY-IDENTIFIER'] == 'Test3'
+
+        # Abbreviations are upper-cased, but only when they're an entire
+        # word that isn't the first one
+        hdr2['file-crc'] = 'Test4'
+        hdr2['x-crc32'] = 'Test5'
+        hdr2['id-file'] = 'Test6'
+        assert 'X-File-CRC' in hdr2.keys()
+        assert 'X-Crc32' in hdr2.keys()
+        assert 'X-Id-File' in hdr2.keys()
+
+        # Our cache never grows without bounds
+        for no in range(HEADER_KEY_CACHE_MAX + 1):
+            assert ('key%d' % no) not in hdr2
+        assert len(HEADER_KEY_CACHE) <= HEADER_KEY_CACHE_MAX
+        assert hdr2['my-identifier'] == 'Test3'
+
+        # The type of key we return matches the type we were given no matter
+        # which of the two we formatted first
+        for keys in (('subject', u'subject'), (u'subject', 'subject')):
+            HEADER_KEY_CACHE.clear()
+            for key in keys:
+                hdr3 = NNTPHeader()
+                hdr3[key] = 'Test4'
+                assert hdr3.keys() == ['Subject']
+                assert type(hdr3.keys()[0]) is type(key)
+
     def test_print_ordering(self):
+        # Every entry in our print sequence is a single header key; a missing
+        # comma would quietly join two of them together
+        hdr = NNTPHeader()
+        for key in HEADER_PRINT_SEQUENCE:
+            assert isinstance(key, str)
+            assert ' ' not in key
+
+            # The key is stored as is
+            hdr[key] = 'value'
+            assert key in hdr.keys()
+        assert len(hdr) == len(HEADER_PRINT_SEQUENCE)
+
         # Initialize Header
         hdr = NNTPHeader()
         hdr['date'] = 'Mon, 05 Jun 2017 07:54:52 -0700'
@@ -32,6 +32,8 @@ from os.path import isfile
 from os.path import join
 from os import chmod
 from os import getcwd
+from os import stat as os_stat
+from filecmp import cmp as compare
 import errno
 
 import re
@@ -58,6 +60,7 @@ from newsreap.Utils import scan_pylib
 from newsreap.Utils import load_pylib
 from newsreap.Utils import hexdump
 from newsreap.Utils import dirsize
+from newsreap.Utils import copy
 
 import logging
 from newsreap.Logging import NEWSREAP_ENGINE
@@ -956,6 +959,42 @@ class Utils_Test(TestBase):
         # Back to normal
         assert(dirsize(work_dir) == strsize_to_bytes('2MB'))
 
+    def test_copy(self):
+        """
+        tests copy()
+
+        """
+        work_dir = join(self.tmp_dir, 'Utils_Test.copy')
+
+        tmp_file01 = join(work_dir, 'test01_1MB')
+        assert self.touch(tmp_file01, size='1MB', random=True)
+        chmod(tmp_file01, 0640)
+
+        # Copy our file
+        tmp_file02 = join(work_dir, 'test02_1MB')
+        assert isfile(tmp_file02) is False
+        copy(tmp_file01, tmp_file02)
+        assert isfile(tmp_file02) is True
+
+        # Our content and permissions should be the same
+        assert compare(tmp_file01, tmp_file02, shallow=False) is True
+        assert os_stat(tmp_file01).st_mode == os_stat(tmp_file02).st_mode
+
+        # Copying to a directory places the file within it
+        tmp_dir = join(work_dir, 'dirA')
+        assert mkdir(tmp_dir) is True
+        copy(tmp_file01, tmp_dir)
+        assert compare(
+            tmp_file01, join(tmp_dir, 'test01_1MB'), shallow=False) is True
+
+        # Copying a file that doesn't exist throws an exception
+        try:
+            copy(join(work_dir, 'missing'), tmp_file02)
+            assert False
+
+        except (IOError, OSError):
+            assert True
+
     def test_parse_paths(self):
         """
         tests parse_paths()